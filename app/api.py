@@ -340,10 +340,9 @@ async def validate_data(db = Depends(get_db)):
         valid_count = 0
         validation_issues = []
         
-        for restaurant in restaurants:
-            restaurant_data = restaurant.to_dict()
-            valid, issues = validate.validate_restaurant_data(restaurant_data)
-            
+        results = validate.validate_restaurants_bulk([restaurant.to_dict() for restaurant in restaurants])
+        
+        for restaurant, (valid, issues) in zip(restaurants, results):
             if valid:
                 valid_count += 1
             else:
@@ -161,6 +161,8 @@ async def _run_pipeline(
             logger.error("Failed to process restaurant", restaurant=restaurant.get("name"), error=str(e))
             continue
     
+    await geocode.close_geocoding_client()
+    
     logger.info("Processing completed", processed_count=len(processed_restaurants))
     
     # Step 5: Export results
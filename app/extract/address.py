@@ -3,6 +3,7 @@
 import re
 from typing import Dict, List, Optional, Tuple
 
+from .base import ExtractionCache
 from .llm_client import LLMDisabled, generate_json, ollama_client
 from ..log import logger
 
@@ -10,7 +11,7 @@ from ..log import logger
 class AddressExtractor:
     """Extract and normalize address information from text chunks."""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ExtractionCache] = None):
         # Indian address patterns
         self.pincode_pattern = re.compile(r'\b\d{6}\b')
         self.address_indicators = [
@@ -22,9 +23,24 @@ class AddressExtractor:
         self.road_keywords = ['road', 'rd', 'street', 'st', 'lane', 'marg', 'path']
         self.area_keywords = ['nagar', 'colony', 'extension', 'sector', 'block', 'phase']
         
+        # Pages seen again (mirrors, re-crawls) skip the regex scan and LLM call
+        self._cache = cache if cache is not None else ExtractionCache()
+        
     async def extract(self, chunks: List[str]) -> Tuple[Dict[str, any], float, List[int]]:
         """Extract address information from text chunks."""
         
+        cache_key = self._cache.key("address", chunks)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = await self._extract(chunks)
+        self._cache.put(cache_key, result)
+        return result
+    
+    async def _extract(self, chunks: List[str]) -> Tuple[Dict[str, any], float, List[int]]:
+        """Run regex extraction, falling back to the LLM on low confidence."""
+        
         logger.debug("Starting address extraction", chunks_count=len(chunks))
         
         # First, try regex-based extraction
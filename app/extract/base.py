@@ -0,0 +1,37 @@
+"""Shared helpers for the field extractors."""
+
+import copy
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Sequence, Tuple
+
+from ..config import settings
+
+# Max extraction results remembered per extractor
+EXTRACTION_CACHE_SIZE = 1024
+
+
+class ExtractionCache:
+    """Bounded LRU of extraction results keyed by field and chunk texts."""
+    
+    def __init__(self, maxsize: int = EXTRACTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._results: OrderedDict[Hashable, Tuple] = OrderedDict()
+    
+    @staticmethod
+    def key(field: str, chunks: Sequence[str]) -> Hashable:
+        """Cache key for one field of a chunk list; LLM results differ when it is toggled."""
+        return field, settings.llm_enabled, tuple(chunks)
+    
+    def get(self, key: Hashable) -> Optional[Tuple]:
+        """Return a copy of the cached result, or None."""
+        result = self._results.get(key)
+        if result is None:
+            return None
+        self._results.move_to_end(key)
+        return copy.deepcopy(result)
+    
+    def put(self, key: Hashable, result: Tuple[Any, ...]) -> None:
+        """Remember a result, evicting the least recently used one."""
+        self._results[key] = copy.deepcopy(result)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
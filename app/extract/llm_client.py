@@ -1,15 +1,113 @@
 """Ollama LLM client for structured JSON extraction."""
 
+import asyncio
+import functools
 import json
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 import httpx
+import orjson
 
 from ..config import settings
 from ..log import logger
 
+# Payloads larger than this are parsed in a worker thread so that other
+# extractors can keep progressing while the JSON is decoded.
+OFFLOAD_PARSE_BYTES = 2048
+
+PROMPTS_DIR = Path("models/prompts")
+SCHEMA_FILES = ("address.json", "hours.json", "cuisines.json")
+
+# JSON schema type names mapped to the Python types they accept
+JSON_TYPES: Dict[str, Tuple[type, ...]] = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+
+def compile_schema_validator(schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+    """Compile a JSON schema into a validator with type lookups resolved up front."""
+    required = tuple(schema.get("required", []))
+    
+    # (field, accepted types, None allowed) for every typed property
+    checks = []
+    for field, prop_schema in schema.get("properties", {}).items():
+        expected_type = prop_schema.get("type")
+        if not expected_type:
+            continue
+        
+        if isinstance(expected_type, list):
+            # Handle ["string", "null"] type definitions
+            types = tuple(t for name in expected_type for t in JSON_TYPES.get(name, ()))
+            checks.append((field, types, True))
+        else:
+            checks.append((field, JSON_TYPES.get(expected_type, ()), False))
+    
+    def validate(data: Dict[str, Any]) -> bool:
+        for field in required:
+            if field not in data:
+                return False
+        
+        for field, types, nullable in checks:
+            if field in data:
+                value = data[field]
+                if nullable and value is None:
+                    continue
+                if not isinstance(value, types):
+                    return False
+        
+        return True
+    
+    return validate
+
+
+def _load_system_prompt(prompts_dir: Path) -> str:
+    """Load system prompt from file."""
+    try:
+        system_file = prompts_dir / "system.txt"
+        with open(system_file, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    except Exception as e:
+        logger.error("Failed to load system prompt", error=str(e))
+        return "You are a helpful assistant that extracts structured data from text."
+
+
+def _load_schemas(prompts_dir: Path) -> Dict[str, Dict]:
+    """Load JSON schemas from files."""
+    schemas = {}
+    
+    for filename in SCHEMA_FILES:
+        try:
+            schema_file = prompts_dir / filename
+            with open(schema_file, 'r', encoding='utf-8') as f:
+                schema_name = filename.replace('.json', '')
+                schemas[schema_name] = json.load(f)
+        except Exception as e:
+            logger.error("Failed to load schema", filename=filename, error=str(e))
+    
+    return schemas
+
+
+@functools.lru_cache(maxsize=None)
+def load_prompts(
+    prompts_dir: Path
+) -> Tuple[str, Dict[str, Dict], Dict[int, Callable[[Dict[str, Any]], bool]]]:
+    """Load the system prompt, schemas and schema validators once per directory."""
+    system_prompt = _load_system_prompt(prompts_dir)
+    schemas = _load_schemas(prompts_dir)
+    
+    # Validators for the loaded schemas, keyed by schema identity
+    validators = {id(schema): compile_schema_validator(schema) for schema in schemas.values()}
+    
+    return system_prompt, schemas, validators
+
 
 class LLMDisabled(Exception):
     """Exception raised when LLM is disabled but required."""
@@ -24,37 +122,9 @@ class OllamaClient:
         self.model = settings.ollama_model
         self.timeout = httpx.Timeout(120.0)  # LLM can be slow
         
-        # Load prompts
-        self.prompts_dir = Path("models/prompts")
-        self.system_prompt = self._load_system_prompt()
-        self.schemas = self._load_schemas()
-    
-    def _load_system_prompt(self) -> str:
-        """Load system prompt from file."""
-        try:
-            system_file = self.prompts_dir / "system.txt"
-            with open(system_file, 'r', encoding='utf-8') as f:
-                return f.read().strip()
-        except Exception as e:
-            logger.error("Failed to load system prompt", error=str(e))
-            return "You are a helpful assistant that extracts structured data from text."
-    
-    def _load_schemas(self) -> Dict[str, Dict]:
-        """Load JSON schemas from files."""
-        schemas = {}
-        
-        schema_files = ["address.json", "hours.json", "cuisines.json"]
-        
-        for filename in schema_files:
-            try:
-                schema_file = self.prompts_dir / filename
-                with open(schema_file, 'r', encoding='utf-8') as f:
-                    schema_name = filename.replace('.json', '')
-                    schemas[schema_name] = json.load(f)
-            except Exception as e:
-                logger.error("Failed to load schema", filename=filename, error=str(e))
-        
-        return schemas
+        # Load prompts (shared by all clients in the process)
+        self.prompts_dir = PROMPTS_DIR
+        self.system_prompt, self.schemas, self.schema_validators = load_prompts(self.prompts_dir)
     
     async def generate_json(
         self,
@@ -102,7 +172,7 @@ Response (JSON only):"""
                 )
                 response.raise_for_status()
                 
-                result = response.json()
+                result = await self._parse_json(response.content)
                 
                 if not result.get("response"):
                     raise ValueError("Empty response from Ollama")
@@ -112,12 +182,12 @@ Response (JSON only):"""
                 
                 # Try to parse as JSON
                 try:
-                    parsed_json = json.loads(json_text)
+                    parsed_json = await self._parse_json(json_text)
                 except json.JSONDecodeError as e:
                     # Try to fix common JSON issues
                     fixed_json = self._fix_json(json_text)
                     try:
-                        parsed_json = json.loads(fixed_json)
+                        parsed_json = await self._parse_json(fixed_json)
                     except json.JSONDecodeError:
                         logger.error("Failed to parse JSON response", json_text=json_text, error=str(e))
                         # Return minimal valid response
@@ -138,6 +208,12 @@ Response (JSON only):"""
             # Return minimal response
             return {"confidence": 0.0, "error": str(e)}
     
+    async def _parse_json(self, data: Union[str, bytes]) -> Any:
+        """Parse JSON, offloading large payloads to a worker thread."""
+        if len(data) > OFFLOAD_PARSE_BYTES:
+            return await asyncio.to_thread(orjson.loads, data)
+        return orjson.loads(data)
+    
     def _fix_json(self, json_text: str) -> str:
         """Attempt to fix common JSON formatting issues."""
         # Remove any text before first {
@@ -161,52 +237,16 @@ Response (JSON only):"""
     def _validate_json_schema(self, data: Dict[str, Any], schema: Dict[str, Any]) -> bool:
         """Basic JSON schema validation."""
         try:
-            # Check required fields
-            required = schema.get("required", [])
-            for field in required:
-                if field not in data:
-                    return False
-            
-            # Check field types
-            properties = schema.get("properties", {})
-            for field, value in data.items():
-                if field in properties:
-                    prop_schema = properties[field]
-                    expected_type = prop_schema.get("type")
-                    
-                    if expected_type:
-                        if isinstance(expected_type, list):
-                            # Handle ["string", "null"] type definitions
-                            if value is not None and not any(self._check_type(value, t) for t in expected_type):
-                                return False
-                        else:
-                            if not self._check_type(value, expected_type):
-                                return False
+            validator = self.schema_validators.get(id(schema))
+            if validator is None:
+                validator = compile_schema_validator(schema)
             
-            return True
+            return validator(data)
             
         except Exception as e:
             logger.error("Schema validation failed", error=str(e))
             return False
     
-    def _check_type(self, value: Any, expected_type: str) -> bool:
-        """Check if value matches expected JSON type."""
-        type_map = {
-            "string": str,
-            "number": (int, float),
-            "integer": int,
-            "boolean": bool,
-            "array": list,
-            "object": dict,
-            "null": type(None)
-        }
-        
-        expected_python_type = type_map.get(expected_type)
-        if expected_python_type:
-            return isinstance(value, expected_python_type)
-        
-        return False
-    
     def get_schema(self, schema_name: str) -> Optional[Dict[str, Any]]:
         """Get schema by name."""
         return self.schemas.get(schema_name)
@@ -1,43 +1,71 @@
 """Phone number extraction with regex-first approach and LLM disambiguation."""
 
 import re
-from typing import List, Optional, Tuple
+from typing import List, NamedTuple, Optional, Tuple
 
+from .base import ExtractionCache
 from .llm_client import LLMDisabled, generate_json
 from ..log import logger
-from ..utils import parse_phone_variants
+
+# Max characters between a phone indicator and the number for a context boost
+INDICATOR_WINDOW = 40
+
+NON_DIGIT_PATTERN = re.compile(r'[^\d]')
+
+# Indian phone number patterns
+PHONE_PATTERNS = (
+    # +91 formats
+    re.compile(r'\+91[-\s]?[6-9]\d{9}'),
+    re.compile(r'\+91[-\s]?\d{2,4}[-\s]?\d{6,8}'),  # Landline
+    
+    # 91 format without +
+    re.compile(r'91[-\s]?[6-9]\d{9}'),
+    re.compile(r'91[-\s]?\d{2,4}[-\s]?\d{6,8}'),
+    
+    # 10-digit mobile
+    re.compile(r'[6-9]\d{9}'),
+    
+    # Landline with STD code
+    re.compile(r'0\d{2,4}[-\s]?\d{6,8}'),
+)
+
+# Phone indicators
+PHONE_INDICATORS = (
+    r'phone', r'mobile', r'call', r'contact', r'tel', r'telephone',
+    r'mob', r'cell', r'फोन', r'मोबाइल'
+)
+INDICATOR_PATTERN = re.compile('|'.join(PHONE_INDICATORS))
+
+
+class PhoneCandidate(NamedTuple):
+    """Phone number match with its digits and mobile check computed once."""
+    raw: str
+    digits: str
+    is_mobile: bool
 
 
 class PhoneExtractor:
     """Extract and normalize phone numbers from text chunks."""
     
-    def __init__(self):
-        # Indian phone number patterns
-        self.patterns = [
-            # +91 formats
-            re.compile(r'\+91[-\s]?[6-9]\d{9}'),
-            re.compile(r'\+91[-\s]?\d{2,4}[-\s]?\d{6,8}'),  # Landline
-            
-            # 91 format without +
-            re.compile(r'91[-\s]?[6-9]\d{9}'),
-            re.compile(r'91[-\s]?\d{2,4}[-\s]?\d{6,8}'),
-            
-            # 10-digit mobile
-            re.compile(r'[6-9]\d{9}'),
-            
-            # Landline with STD code
-            re.compile(r'0\d{2,4}[-\s]?\d{6,8}'),
-        ]
-        
-        # Phone indicators
-        self.phone_indicators = [
-            r'phone', r'mobile', r'call', r'contact', r'tel', r'telephone',
-            r'mob', r'cell', r'फोन', r'मोबाइल'
-        ]
+    def __init__(self, cache: Optional[ExtractionCache] = None):
+        # Pages seen again (mirrors, re-crawls) skip the regex scan and LLM call
+        self._cache = cache if cache is not None else ExtractionCache()
     
     async def extract(self, chunks: List[str]) -> Tuple[Optional[str], float, List[int]]:
         """Extract phone number from text chunks."""
         
+        cache_key = self._cache.key("phone", chunks)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        result = await self._extract(chunks)
+        self._cache.put(cache_key, result)
+        return result
+    
+    async def _extract(self, chunks: List[str]) -> Tuple[Optional[str], float, List[int]]:
+        """Pick the best phone candidate across all chunks."""
+        
         logger.debug("Starting phone extraction", chunks_count=len(chunks))
         
         # Extract all potential phone numbers
@@ -56,43 +84,45 @@ class PhoneExtractor:
         
         # If we have multiple candidates, try to disambiguate
         if len(candidates) > 1:
-            best_phone = await self._disambiguate_phones(candidates, chunks)
+            best_candidate = await self._disambiguate_phones(candidates, chunks)
         else:
-            best_phone = candidates[0]
+            best_candidate = candidates[0]
         
         # Normalize the phone number
-        normalized_phone = self._normalize_phone(best_phone)
-        confidence = self._calculate_confidence(best_phone, chunks)
+        normalized_phone = self._normalize_phone(best_candidate)
+        confidence = self._calculate_confidence(best_candidate, chunks)
         
         logger.debug("Phone extraction completed", phone=normalized_phone, confidence=confidence)
         
         return normalized_phone, confidence, used_chunks
     
-    def _extract_phones_from_chunk(self, chunk: str) -> List[str]:
-        """Extract phone numbers from a single chunk."""
+    def _extract_phones_from_chunk(self, chunk: str) -> List[PhoneCandidate]:
+        """Extract phone number candidates from a single chunk."""
         phones = []
         
-        for pattern in self.patterns:
+        # These patterns cover every form parse_phone_variants matches
+        for pattern in PHONE_PATTERNS:
             matches = pattern.findall(chunk)
             phones.extend(matches)
         
-        # Also try utility function
-        phones.extend(parse_phone_variants(chunk))
-        
-        # Remove duplicates and clean up
-        unique_phones = []
+        # Remove duplicates, keeping the first match for each digit string
+        candidates = {}
         for phone in phones:
-            cleaned = re.sub(r'[-\s()]', '', phone)
-            if cleaned not in [re.sub(r'[-\s()]', '', p) for p in unique_phones]:
-                unique_phones.append(phone)
+            digits = NON_DIGIT_PATTERN.sub('', phone)
+            if digits not in candidates:
+                candidates[digits] = PhoneCandidate(phone, digits, self._is_mobile_number(digits))
         
-        return unique_phones
+        return list(candidates.values())
     
-    async def _disambiguate_phones(self, candidates: List[str], chunks: List[str]) -> str:
+    async def _disambiguate_phones(
+        self,
+        candidates: List[PhoneCandidate],
+        chunks: List[str]
+    ) -> PhoneCandidate:
         """Disambiguate between multiple phone number candidates."""
         
         # Simple heuristics first
-        mobile_candidates = [p for p in candidates if self._is_mobile_number(p)]
+        mobile_candidates = [c for c in candidates if c.is_mobile]
         if len(mobile_candidates) == 1:
             return mobile_candidates[0]
         
@@ -104,7 +134,7 @@ class PhoneExtractor:
 
 {text}
 
-Available phone numbers: {', '.join(candidates)}
+Available phone numbers: {', '.join(c.raw for c in candidates)}
 
 Return the most likely main contact number."""
             
@@ -125,9 +155,10 @@ Return the most likely main contact number."""
             )
             
             selected_phone = result.get("phone")
-            if selected_phone and selected_phone in candidates:
-                logger.debug("LLM selected phone", phone=selected_phone)
-                return selected_phone
+            for candidate in candidates:
+                if selected_phone and candidate.raw == selected_phone:
+                    logger.debug("LLM selected phone", phone=selected_phone)
+                    return candidate
                 
         except (LLMDisabled, Exception) as e:
             logger.debug("LLM disambiguation failed, using heuristics", error=str(e))
@@ -136,27 +167,21 @@ Return the most likely main contact number."""
         if mobile_candidates:
             return mobile_candidates[0]
         
-        return max(candidates, key=len)
+        return max(candidates, key=lambda c: len(c.raw))
     
-    def _is_mobile_number(self, phone: str) -> bool:
-        """Check if phone number is a mobile number."""
-        # Remove formatting
-        digits = re.sub(r'[^\d]', '', phone)
-        
+    def _is_mobile_number(self, digits: str) -> bool:
+        """Check if a digit string is a mobile number."""
         # Indian mobile numbers start with 6-9 and are 10 digits
         if len(digits) == 10:
             return digits[0] in '6789'
         elif len(digits) == 12 and digits.startswith('91'):
             return digits[2] in '6789'
-        elif len(digits) == 13 and digits.startswith('+91'):
-            return digits[3] in '6789'
         
         return False
     
-    def _normalize_phone(self, phone: str) -> str:
+    def _normalize_phone(self, candidate: PhoneCandidate) -> str:
         """Normalize phone number to +91XXXXXXXXXX format."""
-        # Remove all non-digit characters
-        digits = re.sub(r'[^\d]', '', phone)
+        digits = candidate.digits
         
         # Handle different formats
         if len(digits) == 10 and digits[0] in '6789':
@@ -171,41 +196,48 @@ Return the most likely main contact number."""
         elif len(digits) >= 10:
             # Try to extract 10 digits starting with 6-9
             for i in range(len(digits) - 9):
-                candidate = digits[i:i+10]
-                if candidate[0] in '6789':
-                    return f"+91{candidate}"
+                candidate_digits = digits[i:i+10]
+                if candidate_digits[0] in '6789':
+                    return f"+91{candidate_digits}"
         
         # Return as-is if can't normalize
-        return phone
+        return candidate.raw
     
-    def _calculate_confidence(self, phone: str, chunks: List[str]) -> float:
+    def _calculate_confidence(self, candidate: PhoneCandidate, chunks: List[str]) -> float:
         """Calculate confidence score for extracted phone."""
         confidence = 0.0
+        phone = candidate.raw
         
         # Base confidence for having a phone
         confidence += 0.3
         
         # Boost if it's a properly formatted mobile number
-        if self._is_mobile_number(phone):
+        if candidate.is_mobile:
             confidence += 0.2
         
         # Boost if it appears near phone indicators
         text = " ".join(chunks).lower()
-        for indicator in self.phone_indicators:
-            if re.search(indicator, text):
-                context_match = re.search(f'{indicator}.*?{re.escape(phone)}', text)
-                if context_match:
-                    confidence += 0.3
+        phone_start = text.find(phone.lower())
+        if phone_start != -1:
+            phone_end = phone_start + len(phone)
+            indicator_before = indicator_after = False
+            
+            for match in INDICATOR_PATTERN.finditer(text):
+                if match.end() <= phone_start and phone_start - match.end() <= INDICATOR_WINDOW:
+                    indicator_before = True
                     break
-                # Check reverse order too
-                reverse_match = re.search(f'{re.escape(phone)}.*?{indicator}', text)
-                if reverse_match:
-                    confidence += 0.2
+                if match.start() >= phone_end:
+                    # Check reverse order too
+                    indicator_after = match.start() - phone_end <= INDICATOR_WINDOW
                     break
+            
+            if indicator_before:
+                confidence += 0.3
+            elif indicator_after:
+                confidence += 0.2
         
         # Boost if number appears multiple times (consistency)
-        phone_clean = re.sub(r'[^\d]', '', phone)
-        count = sum(1 for chunk in chunks if phone_clean in re.sub(r'[^\d]', '', chunk))
+        count = sum(1 for chunk in chunks if candidate.digits in NON_DIGIT_PATTERN.sub('', chunk))
         if count > 1:
             confidence += 0.1
         
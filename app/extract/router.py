@@ -31,7 +31,7 @@ class ExtractionRouter:
         # Extract each information type
         for info_type, extractor in self.extractors.items():
             try:
-                logger.debug(f"Extracting {info_type}")
+                logger.debug("Extracting field", info_type=info_type)
                 
                 if info_type == "cuisines":
                     # Cuisines extractor returns List[str] instead of single value
@@ -47,7 +47,8 @@ class ExtractionRouter:
                 }
                 
                 logger.debug(
-                    f"Extracted {info_type}",
+                    "Extracted field",
+                    info_type=info_type,
                     confidence=confidence,
                     used_chunks_count=len(used_chunks)
                 )
@@ -5,55 +5,97 @@ import json
 import time
 from pathlib import Path
 from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
 
 import httpx
-from requests_cache import CachedSession
 
 from .config import settings
 from .log import logger
 from .robots import robots_checker
-from .utils import hash_content, hash_url, safe_filename
+from .utils import hash_content
+
+
+# Raw content fetched within this window is served from disk
+CACHE_EXPIRE_SECONDS = 86400  # 24 hours
+
+# Newest saved metadata per URL, for each raw data directory; every fetcher in
+# the process shares one scan of the directory
+_url_indexes: Dict[Path, Dict[str, Dict[str, any]]] = {}
+
+
+def _scan_url_index(raw_data_dir: Path) -> Dict[str, Dict[str, any]]:
+    """Map URLs to their newest saved metadata in a raw data directory."""
+    url_index = {}
+    for metadata_file in raw_data_dir.glob("*.json"):
+        try:
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            
+            url = metadata.get("url")
+            if url and metadata.get("content_hash"):
+                previous = url_index.get(url)
+                if not previous or previous.get("fetched_at", 0) < metadata.get("fetched_at", 0):
+                    url_index[url] = metadata
+                    
+        except Exception as e:
+            logger.debug("Error reading cached file", file=str(metadata_file), error=str(e))
+            continue
+    
+    return url_index
 
 
 class WebContentFetcher:
     """Fetch web content with caching, rate limiting, and robots.txt compliance."""
     
-    def __init__(self):
-        self.session = self._create_cached_session()
-        self.last_request_times: Dict[str, float] = {}
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        # An injected client is shared with the caller, who is responsible for closing it
+        self.client: Optional[httpx.AsyncClient] = client
+        self._owns_client = client is None
+        self.next_request_times: Dict[str, float] = {}
+        self.host_locks: Dict[str, asyncio.Lock] = {}
         self.raw_data_dir = settings.raw_data_dir
+        self._url_index_lock = asyncio.Lock()
         
         # Ensure directories exist
         self.raw_data_dir.mkdir(parents=True, exist_ok=True)
     
-    def _create_cached_session(self) -> CachedSession:
-        """Create cached HTTP session."""
-        cache_file = settings.http_cache_dir / "http_cache"
-        
-        session = CachedSession(
-            cache_name=str(cache_file),
-            backend='sqlite',
-            expire_after=86400,  # 24 hours
-        )
-        
-        session.headers.update({
-            'User-Agent': settings.user_agent,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
-        
-        return session
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=settings.timeout_seconds,
+                follow_redirects=True,
+                headers={
+                    'User-Agent': settings.user_agent,
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                    'Accept-Language': 'en-US,en;q=0.5',
+                },
+            )
+        return self.client
+    
+    async def close(self) -> None:
+        """Close the shared HTTP client if this fetcher created it."""
+        if self.client is not None and self._owns_client:
+            await self.client.aclose()
+            self.client = None
     
     async def fetch_url(self, url: str, timeout: Optional[int] = None) -> Tuple[Optional[bytes], Dict[str, any]]:
         """Fetch URL content with metadata."""
         timeout = timeout or settings.timeout_seconds
         
+        # Serve recently fetched content from the local raw cache
+        url_index = await self._load_url_index()
+        metadata = url_index.get(url)
+        if metadata and time.time() - metadata.get("fetched_at", 0) < CACHE_EXPIRE_SECONDS:
+            content = await asyncio.to_thread(self._read_cached_content, metadata)
+            if content is not None:
+                logger.debug("Serving URL from local cache", url=url)
+                return content, metadata
+        
         logger.info("Fetching URL", url=url)
         
         # Check robots.txt
-        if not robots_checker.can_fetch(url):
+        if not await robots_checker.can_fetch(url, client=self._get_client()):
             logger.warning("Robots.txt disallows fetching", url=url)
             return None, {
                 "url": url,
@@ -66,42 +108,36 @@ class WebContentFetcher:
         await self._apply_rate_limit(url)
         
         try:
-            # Use httpx for async support
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(
-                    url,
-                    headers={'User-Agent': settings.user_agent},
-                    follow_redirects=True
-                )
-                
-                content = response.content
-                metadata = {
-                    "url": url,
-                    "final_url": str(response.url),
-                    "status_code": response.status_code,
-                    "content_type": response.headers.get("content-type", ""),
-                    "content_length": len(content),
-                    "content_hash": hash_content(content),
-                    "fetched_at": time.time(),
-                }
-                
-                if response.status_code >= 400:
-                    logger.warning("HTTP error", url=url, status_code=response.status_code)
-                    metadata["error"] = f"HTTP {response.status_code}"
-                    return None, metadata
-                
-                # Save to disk
-                self._save_raw_content(content, metadata)
-                
-                logger.info(
-                    "Successfully fetched URL",
-                    url=url,
-                    status_code=response.status_code,
-                    content_length=len(content)
-                )
-                
-                return content, metadata
-                
+            response = await self._get_client().get(url, timeout=timeout)
+            
+            content = response.content
+            metadata = {
+                "url": url,
+                "final_url": str(response.url),
+                "status_code": response.status_code,
+                "content_type": response.headers.get("content-type", ""),
+                "content_length": len(content),
+                "content_hash": hash_content(content),
+                "fetched_at": time.time(),
+            }
+            
+            if response.status_code >= 400:
+                logger.warning("HTTP error", url=url, status_code=response.status_code)
+                metadata["error"] = f"HTTP {response.status_code}"
+                return None, metadata
+            
+            # Save to disk
+            await self._save_raw_content(content, metadata)
+            
+            logger.info(
+                "Successfully fetched URL",
+                url=url,
+                status_code=response.status_code,
+                content_length=len(content)
+            )
+            
+            return content, metadata
+            
         except Exception as e:
             logger.error("Failed to fetch URL", url=url, error=str(e))
             return None, {
@@ -111,91 +147,111 @@ class WebContentFetcher:
                 "error": str(e)
             }
     
-    def _save_raw_content(self, content: bytes, metadata: Dict[str, any]) -> None:
-        """Save raw content and metadata to disk."""
+    async def _save_raw_content(self, content: bytes, metadata: Dict[str, any]) -> None:
+        """Save raw content and metadata to disk without blocking the event loop."""
         try:
-            content_hash = metadata["content_hash"]
+            await asyncio.to_thread(self._write_raw_files, content, metadata)
             
-            # Save content
-            content_file = self.raw_data_dir / f"{content_hash}.bin"
-            with open(content_file, 'wb') as f:
-                f.write(content)
+            url_index = _url_indexes.get(self.raw_data_dir)
+            if url_index is not None:
+                url_index[metadata["url"]] = metadata
             
-            # Save metadata
-            metadata_file = self.raw_data_dir / f"{content_hash}.json"
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
-            
-            logger.debug("Saved raw content", content_hash=content_hash, size=len(content))
+            logger.debug("Saved raw content", content_hash=metadata["content_hash"], size=len(content))
             
         except Exception as e:
             logger.error("Failed to save raw content", error=str(e))
     
     async def _apply_rate_limit(self, url: str) -> None:
         """Apply rate limiting per host."""
-        from urllib.parse import urlparse
-        
-        parsed = urlparse(url)
-        host = parsed.netloc
-        
-        current_time = time.time()
-        last_request = self.last_request_times.get(host, 0)
-        
-        # Calculate required delay
+        host = urlparse(url).netloc
+        lock = self.host_locks.setdefault(host, asyncio.Lock())
         min_interval = 1.0 / settings.rate_limit_per_host
-        time_since_last = current_time - last_request
         
-        if time_since_last < min_interval:
-            delay = min_interval - time_since_last
+        # Reserve the next slot under the host lock so concurrent fetches queue up
+        async with lock:
+            now = time.monotonic()
+            request_time = max(now, self.next_request_times.get(host, 0.0))
+            self.next_request_times[host] = request_time + min_interval
+        
+        delay = request_time - now
+        if delay > 0:
             logger.debug("Rate limiting", host=host, delay=delay)
             await asyncio.sleep(delay)
+    
+    def _write_raw_files(self, content: bytes, metadata: Dict[str, any]) -> None:
+        """Write raw content and its metadata files."""
+        content_hash = metadata["content_hash"]
+        
+        # Save content
+        content_file = self.raw_data_dir / f"{content_hash}.bin"
+        with open(content_file, 'wb') as f:
+            f.write(content)
         
-        self.last_request_times[host] = time.time()
+        # Save metadata
+        metadata_file = self.raw_data_dir / f"{content_hash}.json"
+        with open(metadata_file, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
     
     def get_cached_content(self, url: str) -> Tuple[Optional[bytes], Optional[Dict[str, any]]]:
         """Get cached content if available."""
-        url_hash = hash_url(url)
+        url_index = _url_indexes.get(self.raw_data_dir)
+        if url_index is None:
+            url_index = _url_indexes[self.raw_data_dir] = _scan_url_index(self.raw_data_dir)
         
-        # Look for existing files with this URL hash in metadata
-        for metadata_file in self.raw_data_dir.glob("*.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                if metadata.get("url") == url:
-                    # Found matching metadata, load content
-                    content_hash = metadata.get("content_hash")
-                    if content_hash:
-                        content_file = self.raw_data_dir / f"{content_hash}.bin"
-                        if content_file.exists():
-                            with open(content_file, 'rb') as f:
-                                content = f.read()
-                            return content, metadata
-                            
-            except Exception as e:
-                logger.debug("Error reading cached file", file=str(metadata_file), error=str(e))
-                continue
+        metadata = url_index.get(url)
+        if not metadata:
+            return None, None
         
-        return None, None
+        content = self._read_cached_content(metadata)
+        if content is None:
+            return None, None
+        return content, metadata
+    
+    def _read_cached_content(self, metadata: Dict[str, any]) -> Optional[bytes]:
+        """Read the saved content a metadata record points at."""
+        content_file = self.raw_data_dir / f"{metadata['content_hash']}.bin"
+        try:
+            with open(content_file, 'rb') as f:
+                return f.read()
+        except OSError as e:
+            logger.debug("Error reading cached file", file=str(content_file), error=str(e))
+            return None
+    
+    async def _load_url_index(self) -> Dict[str, Dict[str, any]]:
+        """Get the shared URL index, scanning the raw data directory off the event loop once."""
+        url_index = _url_indexes.get(self.raw_data_dir)
+        if url_index is None:
+            # Concurrent first lookups wait for a single scan
+            async with self._url_index_lock:
+                url_index = _url_indexes.get(self.raw_data_dir)
+                if url_index is None:
+                    url_index = await asyncio.to_thread(_scan_url_index, self.raw_data_dir)
+                    _url_indexes[self.raw_data_dir] = url_index
+        return url_index
 
 
-async def fetch_urls(urls: list[str], concurrency: int = 4) -> Dict[str, Tuple[Optional[bytes], Dict[str, any]]]:
-    """Fetch multiple URLs with controlled concurrency."""
-    fetcher = WebContentFetcher()
+async def fetch_urls(
+    urls: list[str],
+    concurrency: int = 4,
+    client: Optional[httpx.AsyncClient] = None
+) -> Dict[str, Tuple[Optional[bytes], Dict[str, any]]]:
+    """Fetch multiple URLs with controlled concurrency, optionally over a caller-owned client."""
+    fetcher = WebContentFetcher(client)
     
+    # Drop duplicate URLs, preserving order
+    urls = list(dict.fromkeys(urls))
+    pending = iter(urls)
     results = {}
-    semaphore = asyncio.Semaphore(concurrency)
-    
-    async def fetch_single(url: str) -> None:
-        async with semaphore:
-            content, metadata = await fetcher.fetch_url(url)
-            results[url] = (content, metadata)
     
-    # Create tasks for all URLs
-    tasks = [fetch_single(url) for url in urls]
+    async def worker() -> None:
+        # Workers share one iterator so only `concurrency` fetches are ever scheduled
+        for url in pending:
+            results[url] = await fetcher.fetch_url(url)
     
-    # Wait for all to complete
-    await asyncio.gather(*tasks)
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(urls)))))
+    finally:
+        await fetcher.close()
     
     logger.info("Batch fetch completed", total_urls=len(urls), successful=sum(1 for content, _ in results.values() if content))
     
@@ -1,17 +1,79 @@
 """Geocoding using Nominatim with SQLite caching."""
 
-import json
+import asyncio
+import hashlib
 import sqlite3
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderQuotaExceeded
+import httpx
+import orjson
 
 from .config import settings
 from .log import logger
-from .utils import hash_content
+
+
+CREATE_CACHE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS geocode_cache (
+        address_hash INTEGER PRIMARY KEY,
+        address_text TEXT NOT NULL,
+        latitude REAL,
+        longitude REAL,
+        response_blob BLOB,
+        cached_at REAL NOT NULL,
+        success INTEGER NOT NULL
+    )
+"""
+CREATE_CACHED_AT_INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_cached_at ON geocode_cache(cached_at)"
+SELECT_CACHE_SQL = "SELECT latitude, longitude, response_blob, success FROM geocode_cache WHERE address_hash = ?"
+UPSERT_CACHE_SQL = """
+    INSERT INTO geocode_cache
+    (address_hash, address_text, latitude, longitude, response_blob, cached_at, success)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(address_hash) DO UPDATE SET
+        address_text = excluded.address_text,
+        latitude = excluded.latitude,
+        longitude = excluded.longitude,
+        response_blob = excluded.response_blob,
+        cached_at = excluded.cached_at,
+        success = excluded.success
+"""
+SELECT_CACHE_MANY_SQL = (
+    "SELECT address_hash, latitude, longitude, response_blob, success "
+    "FROM geocode_cache WHERE address_hash IN ({placeholders})"
+)
+DELETE_OLD_CACHE_SQL = "DELETE FROM geocode_cache WHERE cached_at < ?"
+SELECT_LEGACY_CACHE_SQL = (
+    "SELECT address_text, latitude, longitude, CAST({response_column} AS BLOB), cached_at, success "
+    "FROM geocode_cache_old"
+)
+
+# Max bound parameters per batched cache lookup
+CACHE_LOOKUP_BATCH_SIZE = 500
+
+# Max addresses kept in the in-process LRU in front of SQLite
+MEMORY_CACHE_SIZE = 50_000
+
+CacheEntry = Tuple[Optional[float], Optional[float], dict]
+
+# (address, latitude, longitude, response, success) as passed to GeocodingCache.set
+GeocodeResult = Tuple[str, Optional[float], Optional[float], dict, bool]
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org"
+NOMINATIM_TIMEOUT_SECONDS = 10
+
+# India approximate bounds
+INDIA_LAT_RANGE = (6.0, 38.0)
+INDIA_LON_RANGE = (68.0, 98.0)
+
+
+def _cache_key(address: str) -> int:
+    """Hash a normalized address to a signed 64-bit cache key."""
+    digest = hashlib.blake2b(address.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
 
 
 class GeocodingCache:
@@ -20,57 +82,130 @@ class GeocodingCache:
     def __init__(self, cache_path: Path):
         self.cache_path = cache_path
         self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._conn = self._connect()
         self._init_cache_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open the long-lived cache connection."""
+        conn = sqlite3.connect(self.cache_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+    
     def _init_cache_db(self) -> None:
         """Initialize the cache database."""
-        conn = sqlite3.connect(self.cache_path)
-        try:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS geocode_cache (
-                    address_hash TEXT PRIMARY KEY,
-                    address_text TEXT NOT NULL,
-                    latitude REAL,
-                    longitude REAL,
-                    response_json TEXT,
-                    cached_at REAL NOT NULL,
-                    success INTEGER NOT NULL
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_cached_at ON geocode_cache(cached_at)
-            """)
-            conn.commit()
-        finally:
-            conn.close()
-    
-    def get(self, address: str) -> Optional[Tuple[Optional[float], Optional[float], dict]]:
-        """Get cached geocoding result."""
-        address_hash = hash_content(address.lower().strip())
+        with self._lock:
+            self._migrate_schema()
+            self._conn.execute(CREATE_CACHE_TABLE_SQL)
+            self._conn.execute(CREATE_CACHED_AT_INDEX_SQL)
+    
+    def _migrate_schema(self) -> None:
+        """Rebuild a cache table from an older schema, rekeying rows by address."""
+        columns = {row[1]: row[2] for row in self._conn.execute("PRAGMA table_info(geocode_cache)")}
+        if not columns or (columns.get("address_hash") == "INTEGER" and "response_blob" in columns):
+            return
+        
+        response_column = "response_json" if "response_json" in columns else "response_blob"
         
-        conn = sqlite3.connect(self.cache_path)
         try:
-            cursor = conn.execute(
-                "SELECT latitude, longitude, response_json, success FROM geocode_cache WHERE address_hash = ?",
-                (address_hash,)
-            )
-            row = cursor.fetchone()
+            self._conn.execute("BEGIN")
+            self._conn.execute("ALTER TABLE geocode_cache RENAME TO geocode_cache_old")
+            self._conn.execute("DROP INDEX IF EXISTS idx_cached_at")
+            self._conn.execute(CREATE_CACHE_TABLE_SQL)
+            rows = self._conn.execute(SELECT_LEGACY_CACHE_SQL.format(response_column=response_column)).fetchall()
+            self._conn.executemany(UPSERT_CACHE_SQL, [
+                (_cache_key(address_text.lower().strip()), address_text, lat, lon, response, cached_at, success)
+                for address_text, lat, lon, response, cached_at, success in rows
+            ])
+            self._conn.execute("DROP TABLE geocode_cache_old")
+            self._conn.execute("COMMIT")
             
-            if row:
-                lat, lon, response_json, success = row
-                response = json.loads(response_json) if response_json else {}
-                
-                logger.debug("Cache hit for geocoding", address=address)
-                
-                if success:
-                    return lat, lon, response
-                else:
-                    return None, None, response
+            logger.info("Migrated geocoding cache schema", migrated_count=len(rows))
             
+        except Exception as e:
+            self._conn.execute("ROLLBACK")
+            logger.error("Failed to migrate geocoding cache", error=str(e))
+            raise
+    
+    def _memory_get(self, key: str) -> Optional[CacheEntry]:
+        """Look up a normalized address in the in-process LRU."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+        return entry
+    
+    def _memory_put(self, key: str, entry: CacheEntry) -> None:
+        """Store a normalized address in the in-process LRU."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > MEMORY_CACHE_SIZE:
+            self._memory.popitem(last=False)
+    
+    def _row_to_entry(self, lat: Optional[float], lon: Optional[float], response_blob: Optional[bytes], success: int) -> CacheEntry:
+        """Convert a cache row into a (lat, lon, response) entry."""
+        response = orjson.loads(response_blob) if response_blob else {}
+        if success:
+            return lat, lon, response
+        return None, None, response
+    
+    def get(self, address: str) -> Optional[CacheEntry]:
+        """Get cached geocoding result."""
+        key = address.lower().strip()
+        
+        with self._lock:
+            entry = self._memory_get(key)
+            if entry is not None:
+                return entry
+            row = self._conn.execute(SELECT_CACHE_SQL, (_cache_key(key),)).fetchone()
+        
+        if not row:
             return None
+        
+        entry = self._row_to_entry(*row)
+        logger.debug("Cache hit for geocoding", address=address)
+        
+        with self._lock:
+            self._memory_put(key, entry)
+        
+        return entry
+    
+    def get_many(self, addresses: List[str]) -> Dict[str, CacheEntry]:
+        """Get cached geocoding results for many addresses, keyed by address."""
+        results = {}
+        missing = {}
+        
+        with self._lock:
+            for address in addresses:
+                key = address.lower().strip()
+                entry = self._memory_get(key)
+                if entry is not None:
+                    results[address] = entry
+                else:
+                    missing[_cache_key(key)] = address
             
-        finally:
-            conn.close()
+            # Ascending keys keep each IN batch on neighbouring btree pages
+            hash_list = sorted(missing)
+            rows = []
+            for i in range(0, len(hash_list), CACHE_LOOKUP_BATCH_SIZE):
+                batch = hash_list[i:i + CACHE_LOOKUP_BATCH_SIZE]
+                query = SELECT_CACHE_MANY_SQL.format(placeholders=", ".join("?" * len(batch)))
+                rows.extend(self._conn.execute(query, batch).fetchall())
+        
+        loaded = {}
+        for address_hash, *row in rows:
+            address = missing[address_hash]
+            loaded[address.lower().strip()] = results[address] = self._row_to_entry(*row)
+        
+        with self._lock:
+            for key, entry in loaded.items():
+                self._memory_put(key, entry)
+        
+        logger.debug("Batch cache lookup for geocoding", requested=len(addresses), hits=len(results))
+        
+        return results
     
     def set(
         self, 
@@ -81,61 +216,84 @@ class GeocodingCache:
         success: bool
     ) -> None:
         """Cache geocoding result."""
-        address_hash = hash_content(address.lower().strip())
+        self.set_many([(address, latitude, longitude, response, success)])
+    
+    def set_many(self, results: List[GeocodeResult]) -> None:
+        """Cache many geocoding results in a single transaction."""
+        if not results:
+            return
         
-        conn = sqlite3.connect(self.cache_path)
-        try:
-            conn.execute("""
-                INSERT OR REPLACE INTO geocode_cache 
-                (address_hash, address_text, latitude, longitude, response_json, cached_at, success)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                address_hash,
-                address,
-                latitude,
-                longitude,
-                json.dumps(response),
-                time.time(),
-                1 if success else 0
-            ))
-            conn.commit()
-            
-            logger.debug("Cached geocoding result", address=address, success=success)
+        cached_at = time.time()
+        rows = []
+        
+        with self._lock:
+            for address, latitude, longitude, response, success in results:
+                key = address.lower().strip()
+                self._memory_put(key, (latitude, longitude, response) if success else (None, None, response))
+                rows.append((
+                    _cache_key(key),
+                    address,
+                    latitude,
+                    longitude,
+                    orjson.dumps(response),
+                    cached_at,
+                    1 if success else 0
+                ))
             
-        finally:
-            conn.close()
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(UPSERT_CACHE_SQL, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        
+        logger.debug("Cached geocoding results", count=len(rows))
     
     def cleanup_old_entries(self, max_age_days: int = 30) -> None:
         """Remove old cache entries."""
         cutoff_time = time.time() - (max_age_days * 24 * 60 * 60)
         
-        conn = sqlite3.connect(self.cache_path)
-        try:
-            cursor = conn.execute(
-                "DELETE FROM geocode_cache WHERE cached_at < ?",
-                (cutoff_time,)
-            )
-            deleted_count = cursor.rowcount
-            conn.commit()
-            
+        with self._lock:
+            deleted_count = self._conn.execute(DELETE_OLD_CACHE_SQL, (cutoff_time,)).rowcount
             if deleted_count > 0:
-                logger.info("Cleaned up old geocoding cache entries", deleted_count=deleted_count)
-                
-        finally:
-            conn.close()
+                self._memory.clear()
+        
+        if deleted_count > 0:
+            logger.info("Cleaned up old geocoding cache entries", deleted_count=deleted_count)
+    
+    def close(self) -> None:
+        """Close the cache connection."""
+        with self._lock:
+            self._conn.close()
 
 
 class GeocodeService:
     """Geocoding service with caching and rate limiting."""
     
     def __init__(self):
-        self.geocoder = Nominatim(
-            user_agent=settings.user_agent,
-            timeout=10
-        )
+        self.client: Optional[httpx.AsyncClient] = None
         self.cache = GeocodingCache(settings.geocode_cache)
-        self.last_request_time = 0.0
+        self.last_request_time = float('-inf')
         self.min_request_interval = 1.0  # Nominatim requires 1 request per second
+        self.rate_limit_lock = asyncio.Lock()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared Nominatim client, creating it on first use."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=NOMINATIM_URL,
+                timeout=NOMINATIM_TIMEOUT_SECONDS,
+                limits=httpx.Limits(keepalive_expiry=60),
+                headers={'User-Agent': settings.user_agent},
+            )
+        return self.client
+    
+    async def close(self) -> None:
+        """Close the shared Nominatim client."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
     
     async def geocode_address(self, address: str) -> Tuple[Optional[float], Optional[float]]:
         """Geocode an address to lat/lon coordinates."""
@@ -151,78 +309,118 @@ class GeocodeService:
             lat, lon, response = cached_result
             return lat, lon
         
+        result = await self._query_nominatim(address)
+        if result is None:
+            return None, None
+        
+        self.cache.set(*result)
+        _, lat, lon, _, _ = result
+        return lat, lon
+    
+    async def geocode_addresses(self, addresses: List[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """Geocode many addresses, looking up cached results in one batch."""
+        # Group case/spacing variants so each distinct address is looked up once
+        variants: Dict[str, List[str]] = {}
+        for address in addresses:
+            if address and address.strip():
+                address = address.strip()
+                variants.setdefault(address.lower(), []).append(address)
+        unique_addresses = [group[0] for group in variants.values()]
+        
+        results = {
+            address: (lat, lon)
+            for address, (lat, lon, _) in self.cache.get_many(unique_addresses).items()
+        }
+        
+        # Only cache misses go to Nominatim, serialized by the rate limiter
+        to_cache = []
+        for address in unique_addresses:
+            if address in results:
+                continue
+            
+            result = await self._query_nominatim(address)
+            if result is None:
+                results[address] = (None, None)
+                continue
+            
+            to_cache.append(result)
+            _, lat, lon, _, _ = result
+            results[address] = (lat, lon)
+        
+        self.cache.set_many(to_cache)
+        
+        return {
+            variant: results[group[0]]
+            for group in variants.values()
+            for variant in group
+        }
+    
+    async def _query_nominatim(self, address: str) -> Optional[GeocodeResult]:
+        """Look up an address with Nominatim, returning the result to cache."""
         # Rate limiting for Nominatim
         await self._apply_rate_limit()
         
         try:
             # Geocode with Nominatim
-            location = self.geocoder.geocode(
-                address,
-                exactly_one=True,
-                limit=1,
-                addressdetails=True,
-                extratags=True
-            )
+            response = await self._get_client().get('/search', params={
+                'q': address,
+                'format': 'jsonv2',
+                'addressdetails': 1,
+                'extratags': 1,
+                'limit': 1,
+            })
+            
+            if response.status_code == 429:
+                logger.error("Geocoding quota exceeded", address=address)
+                # Cache to avoid repeated requests
+                return address, None, None, {"error": "Quota exceeded"}, False
             
-            if location:
-                lat, lon = location.latitude, location.longitude
+            response.raise_for_status()
+            results = orjson.loads(response.content)
+            
+            if results:
+                location = results[0]
+                lat, lon = float(location["lat"]), float(location["lon"])
                 
                 # Validate coordinates are in India
                 if self._is_in_india(lat, lon):
-                    # Cache successful result
-                    self.cache.set(
-                        address, 
-                        lat, 
-                        lon, 
-                        {"address": location.address, "raw": location.raw},
-                        success=True
-                    )
-                    
                     logger.info("Successfully geocoded address", address=address, lat=lat, lon=lon)
-                    return lat, lon
+                    return address, lat, lon, {"address": location.get("display_name"), "raw": location}, True
                 else:
                     logger.warning("Geocoded coordinates outside India", address=address, lat=lat, lon=lon)
-                    # Cache unsuccessful result
-                    self.cache.set(address, None, None, {"error": "Outside India bounds"}, success=False)
-                    return None, None
+                    return address, None, None, {"error": "Outside India bounds"}, False
             else:
                 logger.warning("No geocoding results found", address=address)
-                # Cache unsuccessful result
-                self.cache.set(address, None, None, {"error": "No results found"}, success=False)
-                return None, None
+                return address, None, None, {"error": "No results found"}, False
                 
-        except GeocoderTimedOut:
+        except httpx.TimeoutException:
             logger.error("Geocoding request timed out", address=address)
-            return None, None
-            
-        except GeocoderQuotaExceeded:
-            logger.error("Geocoding quota exceeded", address=address)
-            # Cache to avoid repeated requests
-            self.cache.set(address, None, None, {"error": "Quota exceeded"}, success=False)
-            return None, None
+            return None
             
         except Exception as e:
             logger.error("Geocoding failed", address=address, error=str(e))
-            return None, None
+            return None
     
     async def _apply_rate_limit(self) -> None:
         """Apply rate limiting for Nominatim API."""
-        import asyncio
-        
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_request_interval:
-            delay = self.min_request_interval - time_since_last
-            logger.debug("Rate limiting geocoding request", delay=delay)
-            await asyncio.sleep(delay)
-        
-        self.last_request_time = time.time()
+        # Hold the lock through the delay so concurrent lookups queue one per interval
+        async with self.rate_limit_lock:
+            current_time = time.monotonic()
+            time_since_last = current_time - self.last_request_time
+            
+            if time_since_last < self.min_request_interval:
+                delay = self.min_request_interval - time_since_last
+                logger.debug("Rate limiting geocoding request", delay=delay)
+                await asyncio.sleep(delay)
+            
+            self.last_request_time = time.monotonic()
     
-    def _is_in_india(self, lat: float, lon: float) -> bool:
+    @staticmethod
+    def _is_in_india(lat: float, lon: float) -> bool:
         """Check if coordinates are within India bounds."""
-        # India approximate bounds
-        return 6.0 <= lat <= 38.0 and 68.0 <= lon <= 98.0
+        min_lat, max_lat = INDIA_LAT_RANGE
+        min_lon, max_lon = INDIA_LON_RANGE
+        return min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
     
     def cleanup_cache(self) -> None:
         """Clean up old cache entries."""
@@ -238,6 +436,16 @@ async def geocode_address(address: str) -> Tuple[Optional[float], Optional[float
     return await geocode_service.geocode_address(address)
 
 
+async def geocode_addresses(addresses: List[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """Geocode many addresses to coordinates, keyed by stripped address."""
+    return await geocode_service.geocode_addresses(addresses)
+
+
+async def close_geocoding_client() -> None:
+    """Close the shared Nominatim client."""
+    await geocode_service.close()
+
+
 def cleanup_geocoding_cache() -> None:
     """Clean up old geocoding cache entries."""
     geocode_service.cleanup_cache()
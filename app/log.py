@@ -4,6 +4,7 @@ import logging
 import sys
 from typing import Any, Dict
 
+import orjson
 import structlog
 from structlog.types import EventDict
 
@@ -25,19 +26,24 @@ def add_log_level(logger: Any, method_name: str, event_dict: EventDict) -> Event
     return event_dict
 
 
+def render_json(event_dict: EventDict, **kwargs: Any) -> str:
+    """Serialize a log event with orjson."""
+    return orjson.dumps(event_dict, default=str).decode()
+
+
 def setup_logging() -> structlog.BoundLogger:
     """Setup structured logging configuration."""
+    log_level = getattr(logging, settings.log_level.upper())
     
     # Configure standard library logging
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
-        level=getattr(logging, settings.log_level.upper()),
+        level=log_level,
     )
     
-    # Configure structlog
+    # Configure structlog; level filtering happens in the wrapper class
     processors = [
-        structlog.stdlib.filter_by_level,
         structlog.stdlib.add_logger_name,
         add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
@@ -46,7 +52,7 @@ def setup_logging() -> structlog.BoundLogger:
     ]
     
     if settings.log_format == "json":
-        processors.append(structlog.processors.JSONRenderer())
+        processors.append(structlog.processors.JSONRenderer(serializer=render_json))
     else:
         processors.extend([
             structlog.dev.ConsoleRenderer(colors=True),
@@ -54,7 +60,7 @@ def setup_logging() -> structlog.BoundLogger:
     
     structlog.configure(
         processors=processors,
-        wrapper_class=structlog.stdlib.BoundLogger,
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
         logger_factory=structlog.stdlib.LoggerFactory(),
         context_class=dict,
         cache_logger_on_first_use=True,
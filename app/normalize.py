@@ -1,38 +1,135 @@
 """Data normalization utilities for Indian restaurant data."""
 
+import functools
 import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
-from .log import logger
 
+# Max distinct values memoized per scalar normalizer
+NORMALIZE_CACHE_SIZE = 100_000
 
+NON_DIGIT_PATTERN = re.compile(r'[^\d]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+TIME_PATTERN = re.compile(r'^([01]?[0-9]|2[0-3]):[0-5][0-9]$')
+MOBILE_NUMBER_PATTERN = re.compile(r'[6-9]\d{9}')
+
+# Digit count -> (required prefix, start of the 10-digit mobile number)
+PHONE_FORMATS = {
+    10: ('', 0),
+    12: ('91', 2),
+    13: ('91', 3),
+}
+
+# Standard cuisine vocabulary
+STANDARD_CUISINES = frozenset({
+    "NORTH_INDIAN",
+    "SOUTH_INDIAN",
+    "CHINESE",
+    "STREET_FOOD",
+    "BAKERY",
+    "CAFE",
+    "ITALIAN",
+    "MUGHLAI",
+    "SEAFOOD",
+})
+
+# Opening-hours keys, in week order
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# Cuisine variant to standard vocabulary mapping
+CUISINE_MAPPING = {
+    # North Indian variations
+    "north indian": "NORTH_INDIAN",
+    "punjabi": "NORTH_INDIAN",
+    "rajasthani": "NORTH_INDIAN",
+    "hindi": "NORTH_INDIAN",
+    "tandoor": "NORTH_INDIAN",
+    
+    # South Indian variations
+    "south indian": "SOUTH_INDIAN",
+    "tamil": "SOUTH_INDIAN",
+    "kerala": "SOUTH_INDIAN",
+    "andhra": "SOUTH_INDIAN",
+    "karnataka": "SOUTH_INDIAN",
+    "chettinad": "SOUTH_INDIAN",
+    "malabari": "SOUTH_INDIAN",
+    
+    # Chinese variations
+    "chinese": "CHINESE",
+    "indo-chinese": "CHINESE",
+    "indo chinese": "CHINESE",
+    "hakka": "CHINESE",
+    "szechuan": "CHINESE",
+    "canton": "CHINESE",
+    
+    # Street food variations
+    "street food": "STREET_FOOD",
+    "chaat": "STREET_FOOD",
+    "fast food": "STREET_FOOD",
+    "snacks": "STREET_FOOD",
+    
+    # Bakery variations
+    "bakery": "BAKERY",
+    "baked": "BAKERY",
+    "pastry": "BAKERY",
+    
+    # Cafe variations
+    "cafe": "CAFE",
+    "coffee": "CAFE",
+    "tea": "CAFE",
+    "beverages": "CAFE",
+    
+    # Italian variations
+    "italian": "ITALIAN",
+    "pizza": "ITALIAN",
+    "pasta": "ITALIAN",
+    "mediterranean": "ITALIAN",
+    
+    # Mughlai variations
+    "mughlai": "MUGHLAI",
+    "mughal": "MUGHLAI",
+    "nawabi": "MUGHLAI",
+    "lucknowi": "MUGHLAI",
+    "awadhi": "MUGHLAI",
+    
+    # Seafood variations
+    "seafood": "SEAFOOD",
+    "fish": "SEAFOOD",
+    "marine": "SEAFOOD",
+    "coastal": "SEAFOOD",
+    "goan": "SEAFOOD",
+    "mangalorean": "SEAFOOD",
+    "konkani": "SEAFOOD",
+}
+
+# Common restaurant name prefixes/suffixes that don't add value
+NAME_PREFIXES_TO_REMOVE = ("the ", "hotel ", "new ")
+NAME_SUFFIXES_TO_REMOVE = (" restaurant", " hotel", " dhaba")
+
+
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_phone(phone: str) -> Optional[str]:
     """Normalize phone number to +91XXXXXXXXXX format."""
     if not phone:
         return None
     
     # Remove all non-digit characters
-    digits = re.sub(r'[^\d]', '', phone)
-    
-    # Handle different formats
-    if len(digits) == 10 and digits[0] in '6789':
-        # 10-digit mobile number
-        return f"+91{digits}"
-    elif len(digits) == 12 and digits.startswith('91') and digits[2] in '6789':
-        # 91XXXXXXXXXX format
-        return f"+{digits}"
-    elif len(digits) == 13 and digits.startswith('91') and digits[3] in '6789':
-        # 91XXXXXXXXXXX (extra digit, extract 10)
-        return f"+91{digits[3:]}"
-    elif len(digits) >= 10:
-        # Try to find 10-digit mobile within the string
-        for i in range(len(digits) - 9):
-            candidate = digits[i:i+10]
-            if candidate[0] in '6789':
-                return f"+91{candidate}"
+    digits = NON_DIGIT_PATTERN.sub('', phone)
+    
+    # Known formats by length: 10-digit mobile, 91XXXXXXXXXX, 91 plus an extra digit
+    rule = PHONE_FORMATS.get(len(digits))
+    if rule:
+        prefix, start = rule
+        if digits.startswith(prefix) and digits[start] in '6789':
+            return f"+91{digits[start:]}"
     
-    # If can't normalize to mobile, return as-is if it looks like a landline
     if len(digits) >= 10:
+        # Try to find 10-digit mobile within the string
+        match = MOBILE_NUMBER_PATTERN.search(digits)
+        if match:
+            return f"+91{match.group()}"
+        
+        # If can't normalize to mobile, return as-is if it looks like a landline
         return phone.strip()
     
     return None
@@ -44,7 +141,7 @@ def normalize_pincode(pincode: str) -> Optional[str]:
         return None
     
     # Extract only digits
-    digits = re.sub(r'[^\d]', '', pincode)
+    digits = NON_DIGIT_PATTERN.sub('', pincode)
     
     # Must be exactly 6 digits for Indian pincode
     if len(digits) == 6:
@@ -53,6 +150,20 @@ def normalize_pincode(pincode: str) -> Optional[str]:
     return None
 
 
+def normalize_phones(phones: Iterable[str]) -> List[Optional[str]]:
+    """Normalize many phone numbers, computing each distinct value once."""
+    phones = list(phones)
+    normalized = {phone: normalize_phone(phone) for phone in dict.fromkeys(phones)}
+    return [normalized[phone] for phone in phones]
+
+
+def normalize_pincodes(pincodes: Iterable[str]) -> List[Optional[str]]:
+    """Normalize many pincodes, computing each distinct value once."""
+    pincodes = list(pincodes)
+    normalized = {pincode: normalize_pincode(pincode) for pincode in dict.fromkeys(pincodes)}
+    return [normalized[pincode] for pincode in pincodes]
+
+
 def normalize_address_fields(address_data: Dict[str, any]) -> Dict[str, any]:
     """Normalize address field values."""
     if not address_data:
@@ -91,85 +202,6 @@ def map_cuisines_to_vocab(cuisines: List[str]) -> List[str]:
     if not cuisines:
         return []
     
-    # Standard vocabulary
-    standard_vocab = [
-        "NORTH_INDIAN",
-        "SOUTH_INDIAN", 
-        "CHINESE",
-        "STREET_FOOD",
-        "BAKERY",
-        "CAFE",
-        "ITALIAN",
-        "MUGHLAI",
-        "SEAFOOD"
-    ]
-    
-    # Mapping rules
-    cuisine_mapping = {
-        # North Indian variations
-        "north indian": "NORTH_INDIAN",
-        "punjabi": "NORTH_INDIAN",
-        "rajasthani": "NORTH_INDIAN",
-        "hindi": "NORTH_INDIAN",
-        "tandoor": "NORTH_INDIAN",
-        
-        # South Indian variations
-        "south indian": "SOUTH_INDIAN",
-        "tamil": "SOUTH_INDIAN",
-        "kerala": "SOUTH_INDIAN",
-        "andhra": "SOUTH_INDIAN",
-        "karnataka": "SOUTH_INDIAN",
-        "chettinad": "SOUTH_INDIAN",
-        "malabari": "SOUTH_INDIAN",
-        
-        # Chinese variations
-        "chinese": "CHINESE",
-        "indo-chinese": "CHINESE",
-        "indo chinese": "CHINESE",
-        "hakka": "CHINESE",
-        "szechuan": "CHINESE",
-        "canton": "CHINESE",
-        
-        # Street food variations
-        "street food": "STREET_FOOD",
-        "chaat": "STREET_FOOD",
-        "fast food": "STREET_FOOD",
-        "snacks": "STREET_FOOD",
-        
-        # Bakery variations
-        "bakery": "BAKERY",
-        "baked": "BAKERY",
-        "pastry": "BAKERY",
-        
-        # Cafe variations
-        "cafe": "CAFE",
-        "coffee": "CAFE",
-        "tea": "CAFE",
-        "beverages": "CAFE",
-        
-        # Italian variations
-        "italian": "ITALIAN",
-        "pizza": "ITALIAN",
-        "pasta": "ITALIAN",
-        "mediterranean": "ITALIAN",
-        
-        # Mughlai variations
-        "mughlai": "MUGHLAI",
-        "mughal": "MUGHLAI",
-        "nawabi": "MUGHLAI",
-        "lucknowi": "MUGHLAI",
-        "awadhi": "MUGHLAI",
-        
-        # Seafood variations
-        "seafood": "SEAFOOD",
-        "fish": "SEAFOOD",
-        "marine": "SEAFOOD",
-        "coastal": "SEAFOOD",
-        "goan": "SEAFOOD",
-        "mangalorean": "SEAFOOD",
-        "konkani": "SEAFOOD",
-    }
-    
     mapped_cuisines = set()
     
     for cuisine in cuisines:
@@ -177,27 +209,32 @@ def map_cuisines_to_vocab(cuisines: List[str]) -> List[str]:
             continue
             
         # Check if already in standard format
-        if cuisine.upper() in standard_vocab:
-            mapped_cuisines.add(cuisine.upper())
+        cuisine_upper = cuisine.upper()
+        if cuisine_upper in STANDARD_CUISINES:
+            mapped_cuisines.add(cuisine_upper)
             continue
         
         # Try to map from variations
         cuisine_lower = cuisine.lower().strip()
         
-        # Direct mapping
-        if cuisine_lower in cuisine_mapping:
-            mapped_cuisines.add(cuisine_mapping[cuisine_lower])
-            continue
-        
-        # Partial matching for compound terms
-        for variant, standard in cuisine_mapping.items():
-            if variant in cuisine_lower or cuisine_lower in variant:
-                mapped_cuisines.add(standard)
-                break
+        # Direct mapping, then partial matching for compound terms
+        standard = CUISINE_MAPPING.get(cuisine_lower) or _match_cuisine_variant(cuisine_lower)
+        if standard:
+            mapped_cuisines.add(standard)
     
     return list(mapped_cuisines)
 
 
+@functools.lru_cache(maxsize=4096)
+def _match_cuisine_variant(cuisine_lower: str) -> Optional[str]:
+    """Find the first cuisine variant overlapping a compound cuisine term."""
+    for variant, standard in CUISINE_MAPPING.items():
+        if variant in cuisine_lower or cuisine_lower in variant:
+            return standard
+    return None
+
+
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_restaurant_name(name: str) -> str:
     """Normalize restaurant name for consistency."""
     if not name:
@@ -206,26 +243,22 @@ def normalize_restaurant_name(name: str) -> str:
     # Basic cleaning
     normalized = name.strip()
     
-    # Remove common prefixes/suffixes that don't add value
-    prefixes_to_remove = ["the ", "hotel ", "new "]
-    suffixes_to_remove = [" restaurant", " hotel", " dhaba"]
-    
     name_lower = normalized.lower()
     
     # Remove prefixes
-    for prefix in prefixes_to_remove:
+    for prefix in NAME_PREFIXES_TO_REMOVE:
         if name_lower.startswith(prefix):
             normalized = normalized[len(prefix):]
             break
     
     # Remove suffixes  
-    for suffix in suffixes_to_remove:
+    for suffix in NAME_SUFFIXES_TO_REMOVE:
         if name_lower.endswith(suffix):
             normalized = normalized[:-len(suffix)]
             break
     
     # Clean up spacing and capitalization
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    normalized = WHITESPACE_PATTERN.sub(' ', normalized).strip()
     
     # Title case
     normalized = normalized.title()
@@ -233,6 +266,7 @@ def normalize_restaurant_name(name: str) -> str:
     return normalized
 
 
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def normalize_website_url(url: str) -> Optional[str]:
     """Normalize website URL."""
     if not url:
@@ -279,10 +313,7 @@ def normalize_hours_format(hours_data: Dict[str, any]) -> Dict[str, any]:
     
     normalized = {}
     
-    # Expected days
-    days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-    
-    for day in days:
+    for day in WEEKDAYS:
         day_hours = hours_data.get(day, [])
         
         if not day_hours:
@@ -320,15 +351,23 @@ def _is_valid_time(time_str: str) -> bool:
     if not time_str or not isinstance(time_str, str):
         return False
     
-    pattern = re.compile(r'^([01]?[0-9]|2[0-3]):[0-5][0-9]$')
-    return bool(pattern.match(time_str))
+    return bool(TIME_PATTERN.match(time_str))
+
+
+# Fields normalized independently of each other (None keeps the value as-is)
+FIELD_NORMALIZERS = (
+    ('phone', normalize_phone),
+    ('website', normalize_website_url),
+    ('cuisines', map_cuisines_to_vocab),
+    ('hours', normalize_hours_format),
+    ('lat', None),  # Coordinates are already normalized
+    ('lon', None),
+)
 
 
 # Main normalization function
 def normalize_restaurant_data(data: Dict[str, any]) -> Dict[str, any]:
     """Normalize all restaurant data fields."""
-    logger.debug("Normalizing restaurant data")
-    
     normalized = {}
     
     # Name - check both 'name' and 'canonical_name' fields
@@ -350,26 +389,9 @@ def normalize_restaurant_data(data: Dict[str, any]) -> Dict[str, any]:
     if 'pincode' in data and 'pincode' not in normalized:
         normalized['pincode'] = normalize_pincode(data['pincode'])
     
-    # Phone
-    if 'phone' in data:
-        normalized['phone'] = normalize_phone(data['phone'])
-    
-    # Website
-    if 'website' in data:
-        normalized['website'] = normalize_website_url(data['website'])
-    
-    # Cuisines
-    if 'cuisines' in data:
-        normalized['cuisines'] = map_cuisines_to_vocab(data['cuisines'])
-    
-    # Hours
-    if 'hours' in data:
-        normalized['hours'] = normalize_hours_format(data['hours'])
-    
-    # Coordinates (already normalized)
-    for field in ['lat', 'lon']:
+    # Independent fields: phone, website, cuisines, hours, coordinates
+    for field, normalizer in FIELD_NORMALIZERS:
         if field in data:
-            normalized[field] = data[field]
+            normalized[field] = normalizer(data[field]) if normalizer else data[field]
     
-    logger.debug("Data normalization completed")
     return normalized
@@ -1,14 +1,20 @@
 """Content parsing for HTML, PDF, and OCR with chunk extraction."""
 
-import json
+import functools
+import os
 import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from bs4 import BeautifulSoup
-from lxml import html
-from pdfminer.high_level import extract_text_to_fp
+from bs4 import UnicodeDammit
+from lxml import etree, html
+import orjson
+from pdfminer.high_level import extract_text
 from pdfminer.layout import LAParams
 from PIL import Image
 import pytesseract
@@ -18,22 +24,66 @@ from .log import logger
 from .utils import hash_content
 
 
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Stop collecting text under a heading once this many characters are gathered
+SECTION_TEXT_LIMIT = 4000
+
+# Keywords that indicate relevant sections
+RELEVANT_KEYWORDS = (
+    "contact", "address", "location", "find us", "reach us",
+    "hours", "timing", "open", "closed", "schedule",
+    "phone", "call", "mobile", "telephone",
+    "about", "menu", "cuisine", "food", "dining",
+)
+KEYWORD_PATTERN = re.compile('|'.join(map(re.escape, RELEVANT_KEYWORDS)), re.IGNORECASE)
+
+# Container elements whose lowercased "class id" contains a keyword, matched inside libxml2
+KEYWORD_SECTION_XPATH = etree.XPath(
+    '//*[self::div or self::section or self::article or self::aside][{}]'.format(' or '.join(
+        'contains(translate(concat(normalize-space(@class), " ", @id), '
+        f'"ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz"), "{keyword}")'
+        for keyword in RELEVANT_KEYWORDS
+    ))
+)
+
+# JSON-LD @type values kept as structured data
+STRUCTURED_DATA_TYPES = ('Restaurant', 'FoodEstablishment')
+
+# Page breaks or form feeds in extracted PDF text
+PAGE_SPLIT_PATTERN = re.compile(r'\f|\n\s*\n\s*\n')
+
+# HTML markers looked for in the first bytes of untyped content
+HTML_SNIFF_PATTERN = re.compile(rb'<html|<!doctype', re.IGNORECASE)
+HTML_SNIFF_BYTES = 1000
+
+# Shared pdfminer layout settings (read-only during extraction)
+LAPARAMS = LAParams()
+
+# Longest image edge fed to Tesseract; larger photos only slow OCR down
+OCR_MAX_DIMENSION = 1600
+# LSTM engine, single uniform block of text
+OCR_CONFIG = '--oem 1 --psm 6'
+
+# Parse results kept in memory, keyed by content hash and content type
+PARSE_CACHE_SIZE = 1024
+# Chunk source_info keys that carry the URL the content was fetched from
+SOURCE_URL_KEYS = ('url', 'source_url')
+
+
+@dataclass(slots=True)
 class ContentChunk:
     """Represents a chunk of extracted text with metadata."""
     
-    def __init__(
-        self, 
-        text: str, 
-        start_offset: int = 0, 
-        end_offset: int = 0,
-        chunk_type: str = "text",
-        source_info: Optional[Dict] = None
-    ):
-        self.text = text.strip()
-        self.start_offset = start_offset
-        self.end_offset = end_offset
-        self.chunk_type = chunk_type
-        self.source_info = source_info or {}
+    text: str
+    start_offset: int = 0
+    end_offset: int = 0
+    chunk_type: str = "text"
+    source_info: Optional[Dict] = field(default_factory=dict)
+    
+    def __post_init__(self) -> None:
+        self.text = self.text.strip()
+        self.source_info = self.source_info or {}
     
     def to_dict(self) -> Dict[str, any]:
         """Convert chunk to dictionary."""
@@ -51,47 +101,44 @@ class HTMLParser:
     """Parse HTML content and extract relevant sections."""
     
     def __init__(self):
-        # Keywords that indicate relevant sections
-        self.relevant_keywords = [
-            "contact", "address", "location", "find us", "reach us",
-            "hours", "timing", "open", "closed", "schedule",
-            "phone", "call", "mobile", "telephone",
-            "about", "menu", "cuisine", "food", "dining"
-        ]
+        self.relevant_keywords = RELEVANT_KEYWORDS
+        self.keyword_pattern = KEYWORD_PATTERN
     
     def parse(self, content: bytes, url: str = "") -> List[ContentChunk]:
         """Parse HTML content and extract text chunks."""
         try:
-            # Parse with BeautifulSoup for robustness
-            soup = BeautifulSoup(content, 'html.parser')
+            tree = self._parse_document(content)
+            
+            # Extract structured data before scripts are removed
+            structured_chunks = self._extract_structured_data(tree, url)
             
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+            # Remove script and style elements, keeping the text that follows them
+            for element in tree.xpath('//script|//style'):
+                element.drop_tree()
             
             chunks = []
             
             # Extract title
-            title = soup.find('title')
-            if title and title.string:
+            title = tree.find('.//title')
+            if title is not None and title.text:
                 chunks.append(ContentChunk(
-                    text=title.string,
+                    text=title.text,
                     chunk_type="title",
                     source_info={"url": url, "element": "title"}
                 ))
             
             # Extract relevant sections by headings
-            chunks.extend(self._extract_by_headings(soup, url))
+            chunks.extend(self._extract_by_headings(tree, url))
             
             # Extract by keywords in text
-            chunks.extend(self._extract_by_keywords(soup, url))
+            chunks.extend(self._extract_by_keywords(tree, url))
             
-            # Extract structured data
-            chunks.extend(self._extract_structured_data(soup, url))
+            # Add structured data
+            chunks.extend(structured_chunks)
             
             # Fallback: extract all text if we found very little
             if len(chunks) < 3:
-                full_text = soup.get_text()
+                full_text = tree.text_content()
                 if full_text:
                     chunks.append(ContentChunk(
                         text=full_text,
@@ -102,32 +149,46 @@ class HTMLParser:
             logger.debug("HTML parsing completed", url=url, chunks_found=len(chunks))
             return chunks
             
+        except etree.ParserError as e:
+            # lxml refuses empty or whitespace-only documents
+            logger.debug("No HTML document to parse", url=url, error=str(e))
+            return []
+            
         except Exception as e:
             logger.error("HTML parsing failed", url=url, error=str(e))
             return []
     
-    def _extract_by_headings(self, soup: BeautifulSoup, url: str) -> List[ContentChunk]:
+    def _parse_document(self, content: bytes) -> html.HtmlElement:
+        """Parse HTML bytes with lxml, detecting the encoding like BeautifulSoup."""
+        if isinstance(content, bytes) and content.isascii():
+            # Every ASCII-compatible charset decodes these bytes identically,
+            # so skip the (pure-Python) detection that dominates parse time
+            encoding = 'ascii'
+        else:
+            encoding = UnicodeDammit(content, is_html=True).original_encoding
+        parser = html.HTMLParser(encoding=encoding) if encoding else None
+        return html.document_fromstring(content, parser=parser)
+    
+    def _extract_by_headings(self, tree: html.HtmlElement, url: str) -> List[ContentChunk]:
         """Extract content sections by headings."""
         chunks = []
         
-        for heading_tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-            headings = soup.find_all(heading_tag)
-            
-            for heading in headings:
-                heading_text = heading.get_text().strip()
+        for heading_tag in HEADING_TAGS:
+            for heading in tree.iter(heading_tag):
+                heading_text = heading.text_content().strip()
                 
-                if any(keyword in heading_text.lower() for keyword in self.relevant_keywords):
-                    # Extract content after this heading
+                if self.keyword_pattern.search(heading_text):
+                    # Extract content after this heading, up to the section size limit
                     content_parts = [heading_text]
+                    collected_length = 0
                     
-                    # Get next siblings until another heading
-                    for sibling in heading.next_siblings:
-                        if hasattr(sibling, 'name'):
-                            if sibling.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+                    for text in self._iter_section_texts(heading):
+                        text = text.strip()
+                        if text:
+                            content_parts.append(text)
+                            collected_length += len(text)
+                            if collected_length > SECTION_TEXT_LIMIT:
                                 break
-                            text = sibling.get_text().strip()
-                            if text:
-                                content_parts.append(text)
                     
                     if len(content_parts) > 1:
                         chunks.append(ContentChunk(
@@ -142,43 +203,54 @@ class HTMLParser:
         
         return chunks
     
-    def _extract_by_keywords(self, soup: BeautifulSoup, url: str) -> List[ContentChunk]:
+    def _iter_section_texts(self, heading: html.HtmlElement) -> Iterator[str]:
+        """Lazily yield the text between a heading and the next heading."""
+        if heading.tail:
+            yield heading.tail
+        
+        for sibling in heading.itersiblings():
+            if sibling.tag in HEADING_TAGS:
+                break
+            if isinstance(sibling.tag, str):
+                yield sibling.text_content()
+            if sibling.tail:
+                yield sibling.tail
+    
+    def _extract_by_keywords(self, tree: html.HtmlElement, url: str) -> List[ContentChunk]:
         """Extract content by keyword matching."""
         chunks = []
         
         # Find divs/sections with relevant keywords in class or id
-        for element in soup.find_all(['div', 'section', 'article', 'aside']):
-            class_str = ' '.join(element.get('class', []))
-            id_str = element.get('id', '')
-            combined = f"{class_str} {id_str}".lower()
-            
-            if any(keyword in combined for keyword in self.relevant_keywords):
-                text = element.get_text().strip()
-                if text and len(text) > 20:  # Minimum content length
-                    chunks.append(ContentChunk(
-                        text=text,
-                        chunk_type="keyword_section",
-                        source_info={
-                            "url": url,
-                            "element": element.name,
-                            "class": class_str,
-                            "id": id_str
-                        }
-                    ))
+        for element in KEYWORD_SECTION_XPATH(tree):
+            text = element.text_content().strip()
+            if text and len(text) > 20:  # Minimum content length
+                chunks.append(ContentChunk(
+                    text=text,
+                    chunk_type="keyword_section",
+                    source_info={
+                        "url": url,
+                        "element": element.tag,
+                        "class": ' '.join(element.get('class', '').split()),
+                        "id": element.get('id', '')
+                    }
+                ))
         
         return chunks
     
-    def _extract_structured_data(self, soup: BeautifulSoup, url: str) -> List[ContentChunk]:
+    def _extract_structured_data(self, tree: html.HtmlElement, url: str) -> List[ContentChunk]:
         """Extract structured data like JSON-LD, microdata."""
         chunks = []
         
         # Extract JSON-LD structured data
-        for script in soup.find_all('script', type='application/ld+json'):
+        for script_text in tree.xpath('//script[@type="application/ld+json"]/text()'):
+            # Skip the JSON parse for blobs that cannot describe a restaurant
+            if not any(schema_type in script_text for schema_type in STRUCTURED_DATA_TYPES):
+                continue
             try:
-                data = json.loads(script.string)
-                if isinstance(data, dict) and data.get('@type') in ['Restaurant', 'FoodEstablishment']:
+                data = orjson.loads(str(script_text))
+                if isinstance(data, dict) and data.get('@type') in STRUCTURED_DATA_TYPES:
                     chunks.append(ContentChunk(
-                        text=json.dumps(data, indent=2),
+                        text=orjson.dumps(data, option=orjson.OPT_INDENT_2).decode(),
                         chunk_type="structured_data",
                         source_info={"url": url, "format": "json-ld"}
                     ))
@@ -194,18 +266,9 @@ class PDFParser:
     def parse(self, content: bytes, source_url: str = "") -> List[ContentChunk]:
         """Parse PDF content and extract text chunks."""
         try:
-            # Use pdfminer to extract text
-            output_string = BytesIO()
+            # Use pdfminer to extract text straight into a str
             with BytesIO(content) as input_file:
-                extract_text_to_fp(
-                    input_file, 
-                    output_string,
-                    laparams=LAParams(),
-                    output_type='text',
-                    codec=None
-                )
-            
-            text = output_string.getvalue().decode('utf-8')
+                text = extract_text(input_file, laparams=LAPARAMS)
             
             if not text.strip():
                 logger.warning("No text extracted from PDF", source_url=source_url)
@@ -215,7 +278,7 @@ class PDFParser:
             chunks = []
             
             # Try to split by page breaks or form feeds
-            pages = re.split(r'\f|\n\s*\n\s*\n', text)
+            pages = PAGE_SPLIT_PATTERN.split(text)
             
             for i, page_text in enumerate(pages):
                 page_text = page_text.strip()
@@ -245,9 +308,15 @@ class OCRParser:
         try:
             # Open image with PIL
             image = Image.open(BytesIO(content))
+            original_size = image.size
+            
+            # Grayscale and downscale before OCR (JPEGs decode straight at reduced scale)
+            image.draft('L', (OCR_MAX_DIMENSION, OCR_MAX_DIMENSION))
+            image = image.convert('L')
+            image.thumbnail((OCR_MAX_DIMENSION, OCR_MAX_DIMENSION), Image.Resampling.LANCZOS)
             
             # Extract text using Tesseract
-            text = pytesseract.image_to_string(image, lang='eng')
+            text = pytesseract.image_to_string(image, lang='eng', config=OCR_CONFIG)
             
             if not text.strip():
                 logger.warning("No text extracted via OCR", source_url=source_url)
@@ -259,7 +328,7 @@ class OCRParser:
                 chunk_type="ocr_text",
                 source_info={
                     "source_url": source_url,
-                    "image_size": image.size
+                    "image_size": original_size
                 }
             )
             
@@ -279,6 +348,7 @@ class ContentParser:
         self.pdf_parser = PDFParser()
         self.ocr_parser = OCRParser()
         self.parsed_data_dir = settings.parsed_data_dir
+        self._parse_cache: OrderedDict[Tuple[str, str], Tuple[ContentChunk, ...]] = OrderedDict()
         
         # Ensure directory exists
         self.parsed_data_dir.mkdir(parents=True, exist_ok=True)
@@ -294,46 +364,61 @@ class ContentParser:
         if not content:
             return []
         
-        # Determine parser based on content type
         content_type = content_type.lower()
+        content_hash = hash_content(content)
+        cache_key = (content_hash, content_type)
         
-        if 'html' in content_type or 'xml' in content_type:
-            chunks = self.html_parser.parse(content, source_url)
-        elif 'pdf' in content_type:
-            chunks = self.pdf_parser.parse(content, source_url)
-        elif 'image' in content_type:
-            chunks = self.ocr_parser.parse(content, source_url)
-        else:
-            # Try to detect format from content
-            if content.startswith(b'%PDF'):
-                chunks = self.pdf_parser.parse(content, source_url)
-            elif b'<html' in content[:1000].lower() or b'<!doctype' in content[:1000].lower():
-                chunks = self.html_parser.parse(content, source_url)
-            else:
-                logger.warning("Unknown content type", content_type=content_type, source_url=source_url)
-                return []
+        # Identical bytes seen before (retries, mirrors, boilerplate pages)
+        cached = self._parse_cache.get(cache_key)
+        if cached is not None:
+            self._parse_cache.move_to_end(cache_key)
+            return [_with_source_url(chunk, source_url) for chunk in cached]
+        
+        chunks = self._parse_by_type(content, content_type, source_url)
+        
+        self._parse_cache[cache_key] = tuple(chunks)
+        if len(self._parse_cache) > PARSE_CACHE_SIZE:
+            self._parse_cache.popitem(last=False)
         
         # Save parsed chunks
         if chunks:
-            self._save_parsed_chunks(chunks, source_url)
+            self._save_parsed_chunks(chunks, source_url, content_hash)
         
         return chunks
     
-    def _save_parsed_chunks(self, chunks: List[ContentChunk], source_url: str) -> None:
-        """Save parsed chunks to disk."""
+    def _parse_by_type(self, content: bytes, content_type: str, source_url: str) -> List[ContentChunk]:
+        """Route content to the parser for its type."""
+        if 'html' in content_type or 'xml' in content_type:
+            return self.html_parser.parse(content, source_url)
+        if 'pdf' in content_type:
+            return self.pdf_parser.parse(content, source_url)
+        if 'image' in content_type:
+            return self.ocr_parser.parse(content, source_url)
+        
+        # Try to detect format from content
+        if content.startswith(b'%PDF'):
+            return self.pdf_parser.parse(content, source_url)
+        if HTML_SNIFF_PATTERN.search(content, 0, HTML_SNIFF_BYTES):
+            return self.html_parser.parse(content, source_url)
+        
+        logger.warning("Unknown content type", content_type=content_type, source_url=source_url)
+        return []
+    
+    def _save_parsed_chunks(self, chunks: List[ContentChunk], source_url: str, content_hash: str) -> None:
+        """Save parsed chunks to disk, once per distinct content."""
         try:
-            content_hash = hash_content(source_url)
             parsed_file = self.parsed_data_dir / f"{content_hash}.json"
+            if parsed_file.exists():
+                return
             
             chunks_data = {
                 "source_url": source_url,
                 "chunks": [chunk.to_dict() for chunk in chunks],
-                "parsed_at": json.dumps({"timestamp": "now"}),  # Simplified
+                "parsed_at": datetime.utcnow().isoformat(),
                 "total_chunks": len(chunks)
             }
             
-            with open(parsed_file, 'w', encoding='utf-8') as f:
-                json.dump(chunks_data, f, indent=2, ensure_ascii=False)
+            parsed_file.write_bytes(orjson.dumps(chunks_data, option=orjson.OPT_NON_STR_KEYS))
             
             logger.debug("Saved parsed chunks", source_url=source_url, chunks_count=len(chunks))
             
@@ -341,9 +426,24 @@ class ContentParser:
             logger.error("Failed to save parsed chunks", source_url=source_url, error=str(e))
 
 
+def _with_source_url(chunk: ContentChunk, source_url: str) -> ContentChunk:
+    """Copy a cached chunk, pointing its source info at another URL."""
+    source_info = {
+        key: source_url if key in SOURCE_URL_KEYS else value
+        for key, value in chunk.source_info.items()
+    }
+    return replace(chunk, source_info=source_info)
+
+
+@functools.cache
+def get_content_parser() -> ContentParser:
+    """Get the process-wide content parser."""
+    return ContentParser()
+
+
 def parse_file_content(file_path: Path) -> List[ContentChunk]:
     """Parse content from a file."""
-    parser = ContentParser()
+    parser = get_content_parser()
     
     try:
         with open(file_path, 'rb') as f:
@@ -367,3 +467,13 @@ def parse_file_content(file_path: Path) -> List[ContentChunk]:
     except Exception as e:
         logger.error("Failed to parse file", file_path=str(file_path), error=str(e))
         return []
+
+
+def parse_files(file_paths: List[Path], max_workers: Optional[int] = None) -> List[List[ContentChunk]]:
+    """Parse several files across worker processes, preserving input order."""
+    if len(file_paths) <= 1:
+        return [parse_file_content(file_path) for file_path in file_paths]
+    
+    workers = min(max_workers or os.cpu_count() or 1, len(file_paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_file_content, file_paths))
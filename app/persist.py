@@ -1,11 +1,11 @@
 """Database models and persistence layer using SQLAlchemy."""
 
-import json
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
+import orjson
 from sqlalchemy import (
     Column, 
     Integer, 
@@ -14,17 +14,126 @@ from sqlalchemy import (
     Text, 
     DateTime,
     ForeignKey,
+    bindparam,
+    column,
     create_engine,
-    select
+    event,
+    literal_column,
+    or_,
+    select,
+    table,
+    update
 )
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker, relationship
+from sqlalchemy.pool import StaticPool
 
 from .config import settings
 from .log import logger
+from .utils import location_block_key, phone_last10, website_norm
 
 Base = declarative_base()
 
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA cache_size=-65536",    # 64 MiB
+)
+
+# db_path that selects a private in-memory database (used by the tests)
+IN_MEMORY_DB_PATH = ":memory:"
+
+# Rows staged between flushes during a batch upsert
+UPSERT_FLUSH_INTERVAL = 500
+
+
+# Restaurant columns computed from other fields on every write
+DERIVED_COLUMNS = ("block_key", "phone_last10", "website_norm")
+
+
+def _derived_columns(restaurant_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute the derived columns whose source fields are present."""
+    derived = {}
+    if "lat" in restaurant_data and "lon" in restaurant_data:
+        derived["block_key"] = location_block_key(restaurant_data["lat"], restaurant_data["lon"])
+    if "phone" in restaurant_data:
+        derived["phone_last10"] = phone_last10(restaurant_data["phone"])
+    if "website" in restaurant_data:
+        derived["website_norm"] = website_norm(restaurant_data["website"])
+    return derived
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Configure WAL journaling and caching on a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+# Trigram full-text index over the searchable restaurant columns, kept in sync by triggers.
+# Rebuild it with INSERT INTO restaurants_fts(restaurants_fts) VALUES('rebuild') after a VACUUM.
+CREATE_FTS_TABLE_SQL = """
+    CREATE VIRTUAL TABLE restaurants_fts USING fts5(
+        canonical_name, address_full, cuisines,
+        content='restaurants', content_rowid='rowid', tokenize='trigram'
+    )
+"""
+REBUILD_FTS_SQL = "INSERT INTO restaurants_fts(restaurants_fts) VALUES('rebuild')"
+CREATE_FTS_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS restaurants_fts_insert AFTER INSERT ON restaurants BEGIN
+        INSERT INTO restaurants_fts(rowid, canonical_name, address_full, cuisines)
+        VALUES (new.rowid, new.canonical_name, new.address_full, new.cuisines);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS restaurants_fts_delete AFTER DELETE ON restaurants BEGIN
+        INSERT INTO restaurants_fts(restaurants_fts, rowid, canonical_name, address_full, cuisines)
+        VALUES ('delete', old.rowid, old.canonical_name, old.address_full, old.cuisines);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS restaurants_fts_update
+    AFTER UPDATE OF canonical_name, address_full, cuisines ON restaurants BEGIN
+        INSERT INTO restaurants_fts(restaurants_fts, rowid, canonical_name, address_full, cuisines)
+        VALUES ('delete', old.rowid, old.canonical_name, old.address_full, old.cuisines);
+        INSERT INTO restaurants_fts(rowid, canonical_name, address_full, cuisines)
+        VALUES (new.rowid, new.canonical_name, new.address_full, new.cuisines);
+    END
+    """,
+)
+
+restaurants_fts = table(
+    "restaurants_fts",
+    column("rowid"),
+    column("canonical_name"),
+    column("address_full"),
+    column("cuisines"),
+)
+
+
+class MatchCandidates(NamedTuple):
+    """Entity-resolution candidate restaurants, stored column by column."""
+    restaurant_id: Tuple[str, ...]
+    canonical_name: Tuple[str, ...]
+    address_full: Tuple[Optional[str], ...]
+    lat: Tuple[Optional[float], ...]
+    lon: Tuple[Optional[float], ...]
+    phone_last10: Tuple[Optional[str], ...]
+    website_norm: Tuple[Optional[str], ...]
+    
+    @classmethod
+    def empty(cls) -> 'MatchCandidates':
+        return cls(*(() for _ in cls._fields))
+
 
 class Restaurant(Base):
     """Restaurant table model."""
@@ -43,6 +152,11 @@ class Restaurant(Base):
     hours = Column(Text, nullable=True)     # JSON-encoded dict
     updated_at = Column(String, nullable=False)  # ISO8601
     
+    # Entity-resolution blocking keys, derived from the fields above on write
+    block_key = Column(String, nullable=True, index=True)     # Location geohash cell
+    phone_last10 = Column(String, nullable=True, index=True)
+    website_norm = Column(String, nullable=True)              # Scheme/www.-stripped website
+    
     # Relationship to provenance records
     provenance_records = relationship("Provenance", back_populates="restaurant")
     
@@ -57,8 +171,8 @@ class Restaurant(Base):
             "lon": self.lon,
             "phone": self.phone,
             "website": self.website,
-            "cuisines": json.loads(self.cuisines) if self.cuisines else [],
-            "hours": json.loads(self.hours) if self.hours else {},
+            "cuisines": orjson.loads(self.cuisines) if self.cuisines else [],
+            "hours": orjson.loads(self.hours) if self.hours else {},
             "updated_at": self.updated_at,
         }
 
@@ -69,7 +183,7 @@ class Provenance(Base):
     __tablename__ = "provenance"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    restaurant_id = Column(String, ForeignKey("restaurants.restaurant_id"), nullable=False)
+    restaurant_id = Column(String, ForeignKey("restaurants.restaurant_id"), nullable=False, index=True)
     field = Column(String, nullable=False)       # e.g., 'address_full'
     value = Column(Text, nullable=False)         # canonical stored value
     confidence = Column(REAL, nullable=False)
@@ -105,6 +219,7 @@ class DatabaseManager:
         self.db_path = db_path or settings.db_path
         self.engine = None
         self.SessionLocal = None
+        self.fts_enabled = False
         self._initialized = False
     
     def init_db(self) -> None:
@@ -112,19 +227,32 @@ class DatabaseManager:
         if self._initialized:
             return
             
-        # Ensure directory exists
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        engine_options = {}
+        if str(self.db_path) == IN_MEMORY_DB_PATH:
+            # An in-memory database lives in its connection, so every session shares one
+            engine_options["poolclass"] = StaticPool
+        else:
+            # Ensure directory exists
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Create engine
         db_url = f"sqlite:///{self.db_path}"
         self.engine = create_engine(
             db_url,
             connect_args={"check_same_thread": False},
-            echo=False
+            echo=False,
+            **engine_options
         )
+        event.listen(self.engine, "connect", _set_sqlite_pragmas)
         
-        # Create tables
+        # Create tables, plus columns and indexes added to tables that already existed
         Base.metadata.create_all(bind=self.engine)
+        self._add_missing_columns()
+        for model_table in Base.metadata.sorted_tables:
+            for index in model_table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+        
+        self.fts_enabled = self._init_fts()
         
         # Create session factory
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
@@ -132,6 +260,60 @@ class DatabaseManager:
         self._initialized = True
         logger.info("Database initialized", db_path=str(self.db_path))
     
+    def _add_missing_columns(self) -> None:
+        """Add restaurant columns introduced after the table was created and backfill derived keys."""
+        with self.engine.connect() as conn:
+            existing = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(restaurants)")}
+        restaurants = Restaurant.__table__
+        missing = [col for col in restaurants.columns if col.name not in existing]
+        if not missing:
+            return
+        
+        with self.engine.begin() as conn:
+            for col in missing:
+                col_type = col.type.compile(dialect=self.engine.dialect)
+                conn.exec_driver_sql(f"ALTER TABLE restaurants ADD COLUMN {col.name} {col_type}")
+            
+            rows = conn.execute(
+                select(restaurants.c.restaurant_id, restaurants.c.lat, restaurants.c.lon,
+                       restaurants.c.phone, restaurants.c.website)
+            ).mappings().all()
+            if rows:
+                conn.execute(
+                    update(restaurants)
+                    .where(restaurants.c.restaurant_id == bindparam("row_id"))
+                    .values({key: bindparam(key) for key in DERIVED_COLUMNS}),
+                    [{"row_id": row["restaurant_id"], **_derived_columns(row)} for row in rows]
+                )
+        
+        logger.info("Added restaurant columns", columns=[col.name for col in missing], backfilled=len(rows))
+    
+    def _init_fts(self) -> bool:
+        """Create the restaurant full-text index, returning whether it is available."""
+        try:
+            with self.engine.begin() as conn:
+                exists = conn.exec_driver_sql(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'restaurants_fts'"
+                ).first()
+                if not exists:
+                    conn.exec_driver_sql(CREATE_FTS_TABLE_SQL)
+                    conn.exec_driver_sql(REBUILD_FTS_SQL)
+                for trigger_sql in CREATE_FTS_TRIGGERS_SQL:
+                    conn.exec_driver_sql(trigger_sql)
+            return True
+            
+        except OperationalError as e:
+            logger.warning("Full-text search unavailable, using LIKE scans", error=str(e))
+            return False
+    
+    def close(self) -> None:
+        """Dispose of the database engine; the next session reconnects."""
+        if self.engine is not None:
+            self.engine.dispose()
+        self.engine = None
+        self.SessionLocal = None
+        self._initialized = False
+    
     def get_session(self) -> Session:
         """Get database session."""
         if not self._initialized:
@@ -142,57 +324,119 @@ class DatabaseManager:
         self,
         restaurant_data: Dict[str, Any],
         provenance_data: List[Dict[str, Any]]
-    ) -> str:
-        """Upsert restaurant and provenance records."""
+    ) -> Restaurant:
+        """Upsert restaurant and provenance records, returning the stored row."""
         with self.get_session() as session:
             try:
-                # Generate or use existing restaurant ID
-                restaurant_id = restaurant_data.get("restaurant_id")
-                if not restaurant_id:
-                    restaurant_id = str(uuid.uuid4())
-                    restaurant_data["restaurant_id"] = restaurant_id
-                
-                # Set updated timestamp
-                restaurant_data["updated_at"] = datetime.utcnow().isoformat()
-                
-                # JSON encode lists/dicts
-                if "cuisines" in restaurant_data and isinstance(restaurant_data["cuisines"], list):
-                    restaurant_data["cuisines"] = json.dumps(restaurant_data["cuisines"])
+                restaurant = self._upsert_in_session(session, restaurant_data, provenance_data)
+                session.flush()
+                # Detach before commit so the returned row keeps its loaded state
+                session.expunge(restaurant)
+                session.commit()
+                logger.info("Restaurant upserted", restaurant_id=restaurant.restaurant_id)
                 
-                if "hours" in restaurant_data and isinstance(restaurant_data["hours"], dict):
-                    restaurant_data["hours"] = json.dumps(restaurant_data["hours"])
+                return restaurant
                 
-                # Upsert restaurant
-                existing = session.get(Restaurant, restaurant_id)
-                if existing:
-                    # Update existing
-                    for key, value in restaurant_data.items():
-                        if hasattr(existing, key):
-                            setattr(existing, key, value)
-                    restaurant = existing
-                else:
-                    # Create new
-                    restaurant = Restaurant(**restaurant_data)
-                    session.add(restaurant)
-                
-                # Add provenance records
-                for prov_data in provenance_data:
-                    prov_data["restaurant_id"] = restaurant_id
-                    prov_data["extracted_at"] = datetime.utcnow().isoformat()
-                    
-                    provenance = Provenance(**prov_data)
-                    session.add(provenance)
+            except Exception as e:
+                session.rollback()
+                logger.error("Failed to upsert restaurant", error=str(e))
+                raise
+    
+    def upsert_many(
+        self,
+        items: Iterable[Tuple[Dict[str, Any], List[Dict[str, Any]]]]
+    ) -> List[str]:
+        """Upsert (restaurant, provenance) pairs in a single transaction."""
+        with self.get_session() as session:
+            try:
+                restaurant_ids = []
+                batch: List[Dict[str, Any]] = []
+                batch_columns: Tuple[str, ...] = ()
+                for restaurant_data, provenance_data in items:
+                    values, provenance = self._prepare_upsert(restaurant_data, provenance_data)
+                    columns = tuple(values)
+                    # Rows sharing a column set go out as one executemany; a change
+                    # of shape flushes first so later rows still win on conflict
+                    if batch and (columns != batch_columns or len(batch) >= UPSERT_FLUSH_INTERVAL):
+                        session.execute(self._upsert_statement(batch_columns), batch)
+                        session.flush()
+                        batch = []
+                    batch.append(values)
+                    batch_columns = columns
+                    session.add_all(provenance)
+                    restaurant_ids.append(values["restaurant_id"])
                 
+                if batch:
+                    session.execute(self._upsert_statement(batch_columns), batch)
                 session.commit()
-                logger.info("Restaurant upserted", restaurant_id=restaurant_id)
+                logger.info("Restaurants upserted", restaurants_count=len(restaurant_ids))
                 
-                return restaurant_id
+                return restaurant_ids
                 
             except Exception as e:
                 session.rollback()
-                logger.error("Failed to upsert restaurant", error=str(e))
+                logger.error("Failed to upsert restaurants", error=str(e))
                 raise
     
+    def _upsert_in_session(
+        self,
+        session: Session,
+        restaurant_data: Dict[str, Any],
+        provenance_data: List[Dict[str, Any]]
+    ) -> Restaurant:
+        """Stage a restaurant upsert and its provenance records in an open session."""
+        values, provenance = self._prepare_upsert(restaurant_data, provenance_data)
+        # RETURNING hands back the stored row without a follow-up SELECT
+        stmt = self._upsert_statement(tuple(values)).returning(Restaurant)
+        restaurant = session.scalars(stmt, values).one()
+        session.add_all(provenance)
+        
+        return restaurant
+    
+    def _prepare_upsert(
+        self,
+        restaurant_data: Dict[str, Any],
+        provenance_data: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], List[Provenance]]:
+        """Build the restaurant row values and provenance objects for an upsert."""
+        # Generate or use existing restaurant ID
+        restaurant_id = restaurant_data.get("restaurant_id")
+        if not restaurant_id:
+            restaurant_id = str(uuid.uuid4())
+            restaurant_data["restaurant_id"] = restaurant_id
+        
+        # Set updated timestamp
+        now = datetime.utcnow().isoformat()
+        restaurant_data["updated_at"] = now
+        
+        # JSON encode lists/dicts
+        if "cuisines" in restaurant_data and isinstance(restaurant_data["cuisines"], list):
+            restaurant_data["cuisines"] = orjson.dumps(restaurant_data["cuisines"]).decode()
+        
+        if "hours" in restaurant_data and isinstance(restaurant_data["hours"], dict):
+            restaurant_data["hours"] = orjson.dumps(restaurant_data["hours"]).decode()
+        
+        values = {
+            key: value for key, value in restaurant_data.items()
+            if key in Restaurant.__table__.columns
+        }
+        values.update(_derived_columns(restaurant_data))
+        provenance = [
+            Provenance(**{**prov_data, "restaurant_id": restaurant_id, "extracted_at": now})
+            for prov_data in provenance_data
+        ]
+        
+        return values, provenance
+    
+    @staticmethod
+    def _upsert_statement(columns: Tuple[str, ...]):
+        """Build an upsert statement over the given columns, bound per row."""
+        stmt = sqlite_insert(Restaurant)
+        return stmt.on_conflict_do_update(
+            index_elements=["restaurant_id"],
+            set_={key: stmt.excluded[key] for key in columns if key != "restaurant_id"}
+        )
+    
     def get_restaurant(self, restaurant_id: str) -> Optional[Restaurant]:
         """Get restaurant by ID."""
         with self.get_session() as session:
@@ -209,20 +453,49 @@ class DatabaseManager:
         with self.get_session() as session:
             query = select(Restaurant)
             
-            if name:
-                query = query.where(Restaurant.canonical_name.ilike(f"%{name}%"))
-            
-            if city:
-                query = query.where(Restaurant.address_full.ilike(f"%{city}%"))
+            filters = [
+                ("canonical_name", name),
+                ("address_full", city),
+                ("cuisines", cuisine),
+            ]
             
-            if cuisine:
-                query = query.where(Restaurant.cuisines.ilike(f"%{cuisine}%"))
+            for field, term in filters:
+                if not term:
+                    continue
+                pattern = f"%{term}%"
+                if self.fts_enabled:
+                    # Trigram-indexed, case-insensitive substring match
+                    matches = select(restaurants_fts.c.rowid).where(restaurants_fts.c[field].like(pattern))
+                    query = query.where(literal_column("restaurants.rowid").in_(matches))
+                else:
+                    query = query.where(getattr(Restaurant, field).ilike(pattern))
             
             query = query.limit(limit)
             
             result = session.execute(query)
             return result.scalars().all()
     
+    def find_match_candidates(
+        self,
+        block_keys: Iterable[str],
+        phone_key: Optional[str] = None
+    ) -> MatchCandidates:
+        """Get restaurants in any of the location blocks or sharing a phone number."""
+        conditions = []
+        block_keys = list(block_keys)
+        if block_keys:
+            conditions.append(Restaurant.block_key.in_(block_keys))
+        if phone_key:
+            conditions.append(Restaurant.phone_last10 == phone_key)
+        if not conditions:
+            return MatchCandidates.empty()
+        
+        columns = [getattr(Restaurant, field) for field in MatchCandidates._fields]
+        with self.get_session() as session:
+            rows = session.execute(select(*columns).where(or_(*conditions))).all()
+        
+        return MatchCandidates(*zip(*rows)) if rows else MatchCandidates.empty()
+    
     def get_all_restaurants(self, limit: Optional[int] = None) -> List[Restaurant]:
         """Get all restaurants."""
         with self.get_session() as session:
@@ -1,37 +1,61 @@
 """Entity resolution for deduplicating restaurant records."""
 
+import functools
+import heapq
 import uuid
-from typing import Dict, List, Optional, Tuple
+from bisect import bisect_right
+from math import atan2, cos, radians, sin, sqrt
+from typing import Dict, List, Optional, Sequence, Tuple
 
-import geohash2
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
 from .log import logger
-from .persist import db_manager
-from .utils import hash_content
+from .persist import MatchCandidates, db_manager
+from .utils import (
+    BLOCK_GEOHASH_PRECISION,
+    EARTH_RADIUS_KM,
+    encode_geohash,
+    location_block_keys_within,
+    phone_last10,
+    website_norm
+)
+
+# Memoized string comparisons; seeding compares the same names and URLs repeatedly
+SIMILARITY_CACHE_SIZE = 8192
+
+# Distance score by band: within 500m, within 2km, farther or unknown
+DISTANCE_BANDS_KM = (0.5, 2.0)
+DISTANCE_SCORES = (0.3, 0.15, 0.0)
+
+# Overall score above which two records are treated as the same restaurant
+MATCH_THRESHOLD = 0.7
+
+# Without a phone match, a candidate must be this close to score above the match threshold
+CANDIDATE_RADIUS_KM = DISTANCE_BANDS_KM[-1]
+
+
+@functools.lru_cache(maxsize=SIMILARITY_CACHE_SIZE)
+def _name_trigrams(normalized_name: str) -> Tuple[str, ...]:
+    """Smallest 5 distinct trigrams of a normalized name (chain names repeat across rows)."""
+    trigrams = {
+        trigram
+        for trigram in (normalized_name[i:i+3] for i in range(len(normalized_name) - 2))
+        if trigram.isalnum() or ' ' in trigram  # Keep alphanumeric trigrams
+    }
+    return tuple(heapq.nsmallest(5, trigrams))
 
 
 def generate_entity_key(name: str, lat: Optional[float], lon: Optional[float]) -> str:
     """Generate entity key using trigram of name + geohash."""
     
-    # Normalize name for key generation
-    normalized_name = name.lower().strip()
-    
-    # Generate trigrams from name
-    trigrams = set()
-    for i in range(len(normalized_name) - 2):
-        trigram = normalized_name[i:i+3]
-        if trigram.isalnum() or ' ' in trigram:  # Keep alphanumeric trigrams
-            trigrams.add(trigram)
-    
-    # Sort trigrams for consistency
-    sorted_trigrams = sorted(trigrams)[:5]  # Take top 5 trigrams
+    # Top 5 trigrams of the normalized name, sorted for consistency
+    sorted_trigrams = list(_name_trigrams(name.lower().strip()))
     
     # Generate geohash if coordinates available
     geohash = ""
     if lat is not None and lon is not None:
         try:
-            geohash = geohash2.encode(lat, lon, precision=6)  # ~1.2km precision
+            geohash = encode_geohash(lat, lon, BLOCK_GEOHASH_PRECISION)  # ~1.2km precision
         except Exception as e:
             logger.warning("Failed to generate geohash", lat=lat, lon=lon, error=str(e))
     
@@ -47,23 +71,32 @@ def calculate_name_similarity(name1: str, name2: str) -> float:
     if not name1 or not name2:
         return 0.0
     
-    # Normalize names
-    norm1 = name1.lower().strip()
-    norm2 = name2.lower().strip()
+    return _normalized_similarity(name1.lower().strip(), name2.lower().strip())
+
+
+@functools.lru_cache(maxsize=SIMILARITY_CACHE_SIZE)
+def _normalized_similarity(norm1: str, norm2: str) -> float:
+    """Fuzzy similarity of two already-normalized strings."""
+    return fuzz.ratio(norm1, norm2) / 100.0
+
+
+def calculate_name_similarities(name: str, candidates: Sequence[Optional[str]]) -> List[float]:
+    """Calculate name similarity against many candidates in a single rapidfuzz pass."""
+    similarities = [0.0] * len(candidates)
+    if not name:
+        return similarities
     
-    # Use rapidfuzz for similarity calculation
-    similarity = fuzz.ratio(norm1, norm2) / 100.0
+    normalized = [candidate.lower().strip() if candidate else '' for candidate in candidates]
+    for _, score, index in process.extract(name.lower().strip(), normalized, scorer=fuzz.ratio, limit=None):
+        if candidates[index]:
+            similarities[index] = score / 100.0
     
-    return similarity
+    return similarities
 
 
 def calculate_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Calculate distance between two points in kilometers."""
-    from math import radians, sin, cos, sqrt, atan2
-    
     # Haversine formula
-    R = 6371.0  # Earth radius in km
-    
     lat1_rad = radians(lat1)
     lon1_rad = radians(lon1)
     lat2_rad = radians(lat2)
@@ -75,10 +108,55 @@ def calculate_distance_km(lat1: float, lon1: float, lat2: float, lon2: float) ->
     a = sin(dlat/2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlon/2)**2
     c = 2 * atan2(sqrt(a), sqrt(1-a))
     
-    distance = R * c
+    distance = EARTH_RADIUS_KM * c
     return distance
 
 
+def calculate_distances_km(
+    lat: float,
+    lon: float,
+    points: List[Tuple[Optional[float], Optional[float]]]
+) -> List[float]:
+    """Calculate distances from one point to many, inf where a point has no coordinates."""
+    lat_rad = radians(lat)
+    lon_rad = radians(lon)
+    cos_lat = cos(lat_rad)
+    
+    distances = []
+    for point_lat, point_lon in points:
+        if point_lat is None or point_lon is None:
+            distances.append(float('inf'))
+            continue
+        
+        point_lat_rad = radians(point_lat)
+        dlat = point_lat_rad - lat_rad
+        dlon = radians(point_lon) - lon_rad
+        
+        a = sin(dlat/2)**2 + cos_lat * cos(point_lat_rad) * sin(dlon/2)**2
+        distances.append(EARTH_RADIUS_KM * 2 * atan2(sqrt(a), sqrt(1-a)))
+    
+    return distances
+
+
+def _overall_score(
+    name_similarity: float,
+    distance_km: float,
+    phone_match: bool,
+    website_match: bool,
+    address_similarity: float
+) -> float:
+    """Combine the match evidence into a weighted score."""
+    score = (
+        name_similarity * 0.4                                               # Name similarity (40% weight)
+        + DISTANCE_SCORES[bisect_right(DISTANCE_BANDS_KM, distance_km)]     # Distance (30% weight)
+        + 0.2 * phone_match                                                 # Phone match (20% weight)
+        + 0.1 * website_match                                               # Website match (10% weight)
+        + address_similarity * 0.1                                          # Address similarity bonus
+    )
+    
+    return min(score, 1.0)
+
+
 def is_likely_same_restaurant(
     restaurant1: Dict[str, any], 
     restaurant2: Dict[str, any]
@@ -113,23 +191,16 @@ def is_likely_same_restaurant(
     phone2 = restaurant2.get('phone', '')
     
     if phone1 and phone2:
-        # Normalize phones for comparison
-        phone1_digits = ''.join(filter(str.isdigit, phone1))
-        phone2_digits = ''.join(filter(str.isdigit, phone2))
-        
         # Check if last 10 digits match (for mobile numbers)
-        if len(phone1_digits) >= 10 and len(phone2_digits) >= 10:
-            evidence["phone_match"] = phone1_digits[-10:] == phone2_digits[-10:]
+        phone1_key = phone_last10(phone1)
+        evidence["phone_match"] = phone1_key is not None and phone1_key == phone_last10(phone2)
     
     # Website match
     website1 = restaurant1.get('website', '')
     website2 = restaurant2.get('website', '')
     
     if website1 and website2:
-        # Normalize URLs for comparison
-        norm_web1 = website1.lower().replace('http://', '').replace('https://', '').replace('www.', '')
-        norm_web2 = website2.lower().replace('http://', '').replace('https://', '').replace('www.', '')
-        evidence["website_match"] = norm_web1 == norm_web2
+        evidence["website_match"] = website_norm(website1) == website_norm(website2)
     
     # Address similarity
     addr1 = restaurant1.get('address_full', '')
@@ -138,33 +209,16 @@ def is_likely_same_restaurant(
     if addr1 and addr2:
         evidence["address_similarity"] = calculate_name_similarity(addr1, addr2)
     
-    # Calculate overall score
-    score = 0.0
-    
-    # Name similarity (40% weight)
-    score += evidence["name_similarity"] * 0.4
-    
-    # Distance penalty (30% weight)
-    if evidence["distance_km"] < 0.5:  # Within 500m
-        score += 0.3
-    elif evidence["distance_km"] < 2.0:  # Within 2km
-        score += 0.15
-    
-    # Phone match (20% weight)
-    if evidence["phone_match"]:
-        score += 0.2
-    
-    # Website match (10% weight)
-    if evidence["website_match"]:
-        score += 0.1
-    
-    # Address similarity bonus
-    score += evidence["address_similarity"] * 0.1
-    
-    evidence["overall_score"] = min(score, 1.0)
+    evidence["overall_score"] = _overall_score(
+        evidence["name_similarity"],
+        evidence["distance_km"],
+        evidence["phone_match"],
+        evidence["website_match"],
+        evidence["address_similarity"]
+    )
     
     # Decision threshold
-    is_same = evidence["overall_score"] > 0.7
+    is_same = evidence["overall_score"] > MATCH_THRESHOLD
     
     logger.debug(
         "Entity resolution comparison",
@@ -178,6 +232,36 @@ def is_likely_same_restaurant(
     return is_same, evidence["overall_score"], evidence
 
 
+def score_candidates(new_restaurant: Dict[str, any], candidates: MatchCandidates) -> List[float]:
+    """Score a new restaurant against every candidate, column by column."""
+    count = len(candidates.restaurant_id)
+    
+    name_similarities = calculate_name_similarities(
+        new_restaurant.get('canonical_name', ''), candidates.canonical_name
+    )
+    address_similarities = calculate_name_similarities(
+        new_restaurant.get('address_full', ''), candidates.address_full
+    )
+    
+    lat, lon = new_restaurant.get('lat'), new_restaurant.get('lon')
+    if lat is not None and lon is not None:
+        distances = calculate_distances_km(lat, lon, list(zip(candidates.lat, candidates.lon)))
+    else:
+        distances = [float('inf')] * count
+    
+    phone = new_restaurant.get('phone', '')
+    phone_key = phone_last10(phone) if phone else None
+    phone_matches = [phone_key is not None and key == phone_key for key in candidates.phone_last10]
+    
+    website_key = website_norm(new_restaurant.get('website'))
+    website_matches = [website_key is not None and key == website_key for key in candidates.website_norm]
+    
+    return [
+        _overall_score(*evidence)
+        for evidence in zip(name_similarities, distances, phone_matches, website_matches, address_similarities)
+    ]
+
+
 def find_existing_restaurant(new_restaurant: Dict[str, any]) -> Optional[str]:
     """Find existing restaurant that matches the new one."""
     
@@ -192,63 +276,30 @@ def find_existing_restaurant(new_restaurant: Dict[str, any]) -> Optional[str]:
     
     logger.debug("Finding existing restaurant", name=name)
     
-    # Search for potential matches
-    # First, try exact name match
-    exact_matches = db_manager.search_restaurants(name=name, limit=10)
-    
-    # Then try by city if we have location
-    city_matches = []
-    if lat and lon:
-        # Extract city from address or use geocoding
-        address = new_restaurant.get('address_full', '')
-        if address:
-            # Simple city extraction (could be improved)
-            for city in ['bangalore', 'mumbai', 'delhi', 'chennai', 'hyderabad']:
-                if city in address.lower():
-                    city_matches = db_manager.search_restaurants(city=city, limit=20)
-                    break
-    
-    # Finally, try phone number if available
-    phone_matches = []
-    if phone:
-        # This would require a more sophisticated search
-        # For now, we'll search all and filter by phone
-        all_restaurants = db_manager.get_all_restaurants(limit=100)
-        phone_matches = [r for r in all_restaurants if r.phone == phone]
-    
-    # Combine all candidates
-    candidates = []
-    candidates.extend(exact_matches)
-    candidates.extend(city_matches)
-    candidates.extend(phone_matches)
-    
-    # Remove duplicates
-    seen_ids = set()
-    unique_candidates = []
-    for candidate in candidates:
-        if candidate.restaurant_id not in seen_ids:
-            unique_candidates.append(candidate)
-            seen_ids.add(candidate.restaurant_id)
-    
-    logger.debug("Found potential candidates", count=len(unique_candidates))
-    
-    # Score each candidate
+    # Block candidates: only nearby restaurants or shared phones can reach the match threshold
+    block_keys = set()
+    if lat is not None and lon is not None:
+        block_keys = location_block_keys_within(lat, lon, CANDIDATE_RADIUS_KM)
+    
+    candidates = db_manager.find_match_candidates(block_keys, phone_last10(phone))
+    
+    logger.debug("Found potential candidates", count=len(candidates.restaurant_id))
+    
+    # Keep the first candidate with the highest score above the threshold
     best_match = None
     best_score = 0.0
     
-    for candidate in unique_candidates:
-        candidate_data = candidate.to_dict()
-        
-        is_same, score, evidence = is_likely_same_restaurant(new_restaurant, candidate_data)
-        
-        if is_same and score > best_score:
-            best_match = candidate.restaurant_id
+    for restaurant_id, candidate_name, score in zip(
+        candidates.restaurant_id, candidates.canonical_name, score_candidates(new_restaurant, candidates)
+    ):
+        if score > MATCH_THRESHOLD and score > best_score:
+            best_match = restaurant_id
             best_score = score
             
             logger.debug(
                 "Found potential match",
-                candidate_id=candidate.restaurant_id,
-                candidate_name=candidate.canonical_name,
+                candidate_id=restaurant_id,
+                candidate_name=candidate_name,
                 score=score
             )
     
@@ -1,27 +1,89 @@
 """Robots.txt checker for polite web scraping."""
 
+import asyncio
+import re
+import time
 import urllib.robotparser
-from typing import Dict, Optional
-from urllib.parse import urljoin, urlparse
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote, unquote, urljoin, urlparse, urlunparse
+
+import httpx
 
 from .config import settings
 from .log import logger
 
+# Parsed robots.txt files (and failed lookups) are reused for this long
+ROBOTS_CACHE_TTL_SECONDS = 3600
+ROBOTS_TIMEOUT_SECONDS = 5
+
+
+class RobotsRules:
+    """Robots.txt rules for one user agent, compiled into a single first-match-wins pattern."""
+    
+    def __init__(self, rp: urllib.robotparser.RobotFileParser, user_agent: str):
+        self.rp = rp
+        entry = next((e for e in rp.entries if e.applies_to(user_agent)), rp.default_entry)
+        rulelines = entry.rulelines if entry else []
+        # One group per rule, tried in file order; "*" applies to every path
+        self.pattern = re.compile('|'.join(
+            '()' if line.path == '*' else f'({re.escape(line.path)})' for line in rulelines
+        )) if rulelines else None
+        self.allowances = tuple(line.allowance for line in rulelines)
+    
+    def can_fetch(self, url: str) -> bool:
+        """Same decision as RobotFileParser.can_fetch, in one regex match."""
+        if self.rp.disallow_all:
+            return False
+        if self.rp.allow_all:
+            return True
+        if not self.rp.last_checked:
+            return False
+        if self.pattern is None:
+            return True
+        
+        parsed_url = urlparse(unquote(url))
+        path = quote(urlunparse(('', '', parsed_url.path, parsed_url.params, parsed_url.query, parsed_url.fragment)))
+        match = self.pattern.match(path or '/')
+        return self.allowances[match.lastindex - 1] if match else True
+
 
 class RobotsChecker:
     """Check robots.txt compliance before making requests."""
     
     def __init__(self):
-        self._robots_cache: Dict[str, urllib.robotparser.RobotFileParser] = {}
+        self.client: Optional[httpx.AsyncClient] = None
+        self._robots_cache: Dict[str, Tuple[Optional[urllib.robotparser.RobotFileParser], float]] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
+        self._robots_rules: Dict[Tuple[str, str], RobotsRules] = {}
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the robots.txt client, creating it on first use."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                follow_redirects=True,
+                headers={'User-Agent': settings.user_agent},
+            )
+        return self.client
+    
+    async def close(self) -> None:
+        """Close the robots.txt client."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
     
-    def can_fetch(self, url: str, user_agent: Optional[str] = None) -> bool:
+    async def can_fetch(
+        self,
+        url: str,
+        user_agent: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> bool:
         """Check if URL can be fetched according to robots.txt."""
         try:
             parsed_url = urlparse(url)
             base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
             
             # Get robots.txt parser for this domain
-            rp = self._get_robots_parser(base_url)
+            rp = await self._get_robots_parser(base_url, client)
             
             if not rp:
                 # If we can't fetch robots.txt, allow the request
@@ -29,7 +91,10 @@ class RobotsChecker:
                 return True
             
             user_agent = user_agent or settings.user_agent
-            can_fetch = rp.can_fetch(user_agent, url)
+            rules = self._robots_rules.get((base_url, user_agent))
+            if rules is None or rules.rp is not rp:
+                rules = self._robots_rules[(base_url, user_agent)] = RobotsRules(rp, user_agent)
+            can_fetch = rules.can_fetch(url)
             
             logger.debug(
                 "Robots.txt check", 
@@ -45,35 +110,62 @@ class RobotsChecker:
             # On error, allow the request to avoid blocking legitimate requests
             return True
     
-    def _get_robots_parser(self, base_url: str) -> Optional[urllib.robotparser.RobotFileParser]:
+    async def _get_robots_parser(
+        self,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> Optional[urllib.robotparser.RobotFileParser]:
         """Get robots.txt parser for base URL with caching."""
-        if base_url in self._robots_cache:
-            return self._robots_cache[base_url]
+        cached = self._robots_cache.get(base_url)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
         
+        # One download per host even when several fetches start at once
+        lock = self._robots_locks.setdefault(base_url, asyncio.Lock())
+        async with lock:
+            cached = self._robots_cache.get(base_url)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+            
+            rp = await self._load_robots(base_url, client or self._get_client())
+            self._robots_cache[base_url] = (rp, time.monotonic() + ROBOTS_CACHE_TTL_SECONDS)
+            self._robots_locks.pop(base_url, None)
+            return rp
+    
+    async def _load_robots(
+        self,
+        base_url: str,
+        client: httpx.AsyncClient
+    ) -> Optional[urllib.robotparser.RobotFileParser]:
+        """Download and parse robots.txt, mirroring RobotFileParser.read() status handling."""
         try:
             robots_url = urljoin(base_url, "/robots.txt")
-            rp = urllib.robotparser.RobotFileParser()
-            rp.set_url(robots_url)
-            rp.read()
+            response = await client.get(robots_url, timeout=ROBOTS_TIMEOUT_SECONDS)
+            
+            rp = urllib.robotparser.RobotFileParser(robots_url)
+            if response.status_code in (401, 403):
+                rp.disallow_all = True
+            elif 400 <= response.status_code < 500:
+                rp.allow_all = True
+            elif response.is_success:
+                rp.parse(response.content.decode('utf-8').splitlines())
             
-            self._robots_cache[base_url] = rp
-            logger.debug("Loaded robots.txt", robots_url=robots_url)
+            logger.debug("Loaded robots.txt", robots_url=robots_url, status_code=response.status_code)
             
             return rp
             
         except Exception as e:
             logger.warning("Failed to load robots.txt", base_url=base_url, error=str(e))
             # Cache None to avoid repeated failures
-            self._robots_cache[base_url] = None
             return None
     
-    def get_crawl_delay(self, url: str, user_agent: Optional[str] = None) -> Optional[float]:
+    async def get_crawl_delay(self, url: str, user_agent: Optional[str] = None) -> Optional[float]:
         """Get crawl delay from robots.txt."""
         try:
             parsed_url = urlparse(url)
             base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
             
-            rp = self._get_robots_parser(base_url)
+            rp = await self._get_robots_parser(base_url)
             if not rp:
                 return None
                 
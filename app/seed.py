@@ -1,11 +1,13 @@
 """OSM data seeding using Overpass API."""
 
 import asyncio
+import csv
 import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
+import orjson
 from slugify import slugify
 
 from .config import settings
@@ -24,6 +26,10 @@ CITY_COORDS = {
     "kol": {"lat": 22.5726, "lon": 88.3639, "radius": 15000, "name": "Kolkata"},
 }
 
+# Overpass queries in flight at once when seeding several cities
+OVERPASS_CONCURRENCY = 2
+OVERPASS_POLITE_DELAY_SECONDS = 1.0
+
 
 class OverpassClient:
     """Client for Overpass API to fetch OSM restaurant data."""
@@ -31,6 +37,32 @@ class OverpassClient:
     def __init__(self):
         self.base_url = "https://overpass-api.de/api/interpreter"
         self.timeout = httpx.Timeout(60.0)  # Overpass can be slow
+        self.client: Optional[httpx.AsyncClient] = None
+    
+    async def __aenter__(self) -> 'OverpassClient':
+        return self
+    
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the pooled Overpass client, creating it on first use."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=OVERPASS_CONCURRENCY, keepalive_expiry=60),
+                headers={
+                    "User-Agent": settings.user_agent,
+                    "Content-Type": "text/plain"
+                },
+            )
+        return self.client
+    
+    async def close(self) -> None:
+        """Close the pooled Overpass client."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
     
     async def query_restaurants(
         self, 
@@ -61,27 +93,19 @@ class OverpassClient:
         )
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                with Timer("overpass_query") as timer:
-                    response = await client.post(
-                        self.base_url,
-                        data=query,
-                        headers={
-                            "User-Agent": settings.user_agent,
-                            "Content-Type": "text/plain"
-                        }
-                    )
-                    response.raise_for_status()
-                
-                data = response.json()
-                logger.info(
-                    "Overpass query completed",
-                    elements_found=len(data.get("elements", [])),
-                    duration=timer.elapsed
-                )
-                
-                return self._process_overpass_results(data, limit)
-                
+            with Timer("overpass_query") as timer:
+                response = await self._get_client().post(self.base_url, content=query)
+                response.raise_for_status()
+            
+            data = orjson.loads(response.content)
+            logger.info(
+                "Overpass query completed",
+                elements_found=len(data.get("elements", [])),
+                duration=timer.elapsed
+            )
+            
+            return self._process_overpass_results(data, limit)
+            
         except Exception as e:
             logger.error("Overpass API query failed", error=str(e))
             raise
@@ -174,6 +198,45 @@ class OverpassClient:
 
 async def seed_city(city_slug: str, limit: Optional[int] = None) -> List[Dict[str, any]]:
     """Seed restaurant data for a city using OSM."""
+    async with OverpassClient() as client:
+        return await _seed_city_with_client(client, city_slug, limit)
+
+
+async def seed_all_cities(
+    city_slugs: Optional[List[str]] = None,
+    limit: Optional[int] = None
+) -> Dict[str, List[Dict[str, any]]]:
+    """Seed several cities concurrently, a few Overpass queries at a time."""
+    city_slugs = list(city_slugs or CITY_COORDS)
+    for city_slug in city_slugs:
+        if city_slug not in CITY_COORDS:
+            raise ValueError(f"Unknown city: {city_slug}. Available: {list(CITY_COORDS.keys())}")
+    
+    semaphore = asyncio.Semaphore(OVERPASS_CONCURRENCY)
+    
+    async with OverpassClient() as client:
+        async def seed_one(city_slug: str) -> List[Dict[str, any]]:
+            async with semaphore:
+                return await _seed_city_with_client(client, city_slug, limit)
+        
+        results = await asyncio.gather(*(seed_one(slug) for slug in city_slugs), return_exceptions=True)
+    
+    seeded = {}
+    for city_slug, result in zip(city_slugs, results):
+        if isinstance(result, Exception):
+            logger.error("City seeding failed", city_slug=city_slug, error=str(result))
+            result = []
+        seeded[city_slug] = result
+    
+    return seeded
+
+
+async def _seed_city_with_client(
+    client: OverpassClient,
+    city_slug: str,
+    limit: Optional[int] = None
+) -> List[Dict[str, any]]:
+    """Seed one city through the given Overpass client."""
     if city_slug not in CITY_COORDS:
         raise ValueError(f"Unknown city: {city_slug}. Available: {list(CITY_COORDS.keys())}")
     
@@ -181,9 +244,8 @@ async def seed_city(city_slug: str, limit: Optional[int] = None) -> List[Dict[st
     logger.info("Starting OSM seed", city=city_info["name"], city_slug=city_slug)
     
     # Rate limiting for politeness
-    await asyncio.sleep(1.0)  # Be polite to Overpass API
+    await asyncio.sleep(OVERPASS_POLITE_DELAY_SECONDS)  # Be polite to Overpass API
     
-    client = OverpassClient()
     restaurants = await client.query_restaurants(
         lat=city_info["lat"],
         lon=city_info["lon"],
@@ -202,9 +264,6 @@ async def seed_city(city_slug: str, limit: Optional[int] = None) -> List[Dict[st
 
 def seed_from_file(file_path: Path) -> List[Dict[str, any]]:
     """Seed restaurant data from CSV file (for offline demo)."""
-    import csv
-    import json
-    
     restaurants = []
     
     try:
@@ -213,8 +272,8 @@ def seed_from_file(file_path: Path) -> List[Dict[str, any]]:
             
             for row in reader:
                 # Parse JSON fields
-                cuisines = json.loads(row.get("cuisines", "[]"))
-                hours = json.loads(row.get("hours_json", "{}"))
+                cuisines = orjson.loads(row.get("cuisines", "[]"))
+                hours = orjson.loads(row.get("hours_json", "{}"))
                 
                 restaurant = {
                     "name": row["name"],
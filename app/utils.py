@@ -1,9 +1,40 @@
 """Utility functions for the application."""
 
+import functools
 import hashlib
+import math
+import re
 import time
 from pathlib import Path
-from typing import Any, Union
+from typing import Any, Optional, Set, Union
+
+# Indian phone number patterns; overlapping forms (+91, 91, bare) are all reported
+PHONE_VARIANT_PATTERNS = (
+    re.compile(r'\+91[-\s]?[6-9]\d{9}'),  # +91 format
+    re.compile(r'91[-\s]?[6-9]\d{9}'),    # 91 format
+    re.compile(r'[6-9]\d{9}'),            # 10-digit mobile
+    re.compile(r'0\d{2,4}[-\s]?\d{6,8}'), # Landline with STD code
+)
+
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Spreads the 8 bits of a byte onto the even bit positions of 16 bits
+_GEOHASH_SPREAD = tuple(
+    sum(((byte >> bit) & 1) << (2 * bit) for bit in range(8)) for byte in range(256)
+)
+
+# Geohash length of entity-resolution location blocks (~1.2km x 0.6km cells)
+BLOCK_GEOHASH_PRECISION = 6
+# Cell size in degrees at that precision: bits alternate lon/lat, starting with lon
+BLOCK_CELL_LAT_DEGREES = 180.0 / 2 ** (5 * BLOCK_GEOHASH_PRECISION // 2)
+BLOCK_CELL_LON_DEGREES = 360.0 / 2 ** ((5 * BLOCK_GEOHASH_PRECISION + 1) // 2)
+# Relative padding on block search radii, absorbing float rounding at cell edges
+BLOCK_RADIUS_MARGIN = 1.01
+
+# Mean earth radius, shared by distance scoring and location blocking
+EARTH_RADIUS_KM = 6371.0
+
+# Scheme and leading www. dropped so equivalent website URLs compare equal
+WEBSITE_PREFIX_PATTERN = re.compile(r'^https?://(www\.)?')
 
 
 def hash_content(content: Union[str, bytes]) -> str:
@@ -13,9 +44,14 @@ def hash_content(content: Union[str, bytes]) -> str:
     return hashlib.sha256(content).hexdigest()
 
 
+def short_hash(text: str) -> str:
+    """Generate a fast 16-character hash for filenames and cache keys (not for integrity)."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
 def hash_url(url: str) -> str:
     """Generate hash for URL to use as filename."""
-    return hash_content(url)[:16]
+    return short_hash(url)
 
 
 def safe_filename(name: str, max_length: int = 255) -> str:
@@ -32,7 +68,7 @@ def safe_filename(name: str, max_length: int = 255) -> str:
     
     # Truncate if too long
     if len(filename) > max_length:
-        filename = filename[:max_length-8] + '_' + hash_content(name)[:7]
+        filename = filename[:max_length-8] + '_' + short_hash(name)[:7]
     
     return filename
 
@@ -75,19 +111,91 @@ def truncate_text(text: str, max_length: int = 100) -> str:
 
 def parse_phone_variants(text: str) -> list[str]:
     """Extract potential phone number variants from text."""
-    import re
-    
-    # Pattern for Indian phone numbers
-    patterns = [
-        r'\+91[-\s]?[6-9]\d{9}',  # +91 format
-        r'91[-\s]?[6-9]\d{9}',    # 91 format  
-        r'[6-9]\d{9}',            # 10-digit mobile
-        r'0\d{2,4}[-\s]?\d{6,8}', # Landline with STD code
-    ]
-    
     phones = []
-    for pattern in patterns:
-        matches = re.findall(pattern, text)
-        phones.extend(matches)
+    for pattern in PHONE_VARIANT_PATTERNS:
+        phones.extend(pattern.findall(text))
     
     return list(set(phones))  # Remove duplicates
+
+
+def encode_geohash(lat: float, lon: float, precision: int) -> str:
+    """Encode a standard geohash by interleaving integer cell indices."""
+    total_bits = 5 * precision
+    lat_bits = total_bits // 2
+    lon_bits = total_bits - lat_bits
+    
+    lat_index = _geohash_cell_index((lat + 90.0) / 180.0, lat_bits)
+    lon_index = _geohash_cell_index((lon + 180.0) / 360.0, lon_bits)
+    
+    # Bits alternate lon/lat starting with lon at the most significant position
+    if total_bits % 2:
+        code = _spread_bits(lon_index) | _spread_bits(lat_index) << 1
+    else:
+        code = _spread_bits(lon_index) << 1 | _spread_bits(lat_index)
+    
+    return ''.join([
+        GEOHASH_BASE32[(code >> shift) & 31] for shift in range(total_bits - 5, -1, -5)
+    ])
+
+
+def _geohash_cell_index(fraction: float, bits: int) -> int:
+    """Index of the cell holding a 0..1 fraction; boundaries fall in the lower cell."""
+    cells = 1 << bits
+    return min(max(math.ceil(fraction * cells) - 1, 0), cells - 1)
+
+
+def _spread_bits(value: int) -> int:
+    """Move bit i of value to bit 2i."""
+    spread = 0
+    shift = 0
+    while value:
+        spread |= _GEOHASH_SPREAD[value & 0xFF] << shift
+        value >>= 8
+        shift += 16
+    return spread
+
+
+@functools.lru_cache(maxsize=8192)
+def phone_last10(phone: Optional[str]) -> Optional[str]:
+    """Last 10 digits of a phone number, or None if it has fewer digits."""
+    digits = ''.join(filter(str.isdigit, phone or ''))
+    return digits[-10:] if len(digits) >= 10 else None
+
+
+@functools.lru_cache(maxsize=8192)
+def website_norm(website: Optional[str]) -> Optional[str]:
+    """Lowercased website URL without scheme and www., or None if empty."""
+    if not website:
+        return None
+    return WEBSITE_PREFIX_PATTERN.sub('', website.lower())
+
+
+def location_block_key(lat: Optional[float], lon: Optional[float]) -> Optional[str]:
+    """Geohash cell that blocks entity-resolution candidates by location."""
+    if lat is None or lon is None:
+        return None
+    return encode_geohash(lat, lon, BLOCK_GEOHASH_PRECISION)
+
+
+def location_block_keys_within(lat: float, lon: float, radius_km: float) -> Set[str]:
+    """Geohash block cells overlapping a box that holds every point within radius_km."""
+    # Central angle on the same sphere the haversine distance uses
+    angle = radius_km * BLOCK_RADIUS_MARGIN / EARTH_RADIUS_KM
+    lat_radius = math.degrees(angle)
+    
+    # Meridians converge poleward, so the widest longitude span is at the box edge
+    # farthest from the equator: sin(dlon/2) <= sin(angle/2) / cos(edge latitude)
+    edge_cos = math.cos(math.radians(min(abs(lat) + lat_radius, 90.0)))
+    lon_ratio = math.sin(angle / 2) / edge_cos if edge_cos > 0 else 1.0
+    lon_radius = math.degrees(2 * math.asin(min(lon_ratio, 1.0)))
+    
+    def _samples(center: float, radius: float, step: float) -> list[float]:
+        # Points no more than one cell apart hit every cell along the axis
+        count = int(2 * radius // step) + 1
+        return [center - radius + i * step for i in range(count)] + [center + radius]
+    
+    return {
+        location_block_key(sample_lat, sample_lon)
+        for sample_lat in _samples(lat, lat_radius, BLOCK_CELL_LAT_DEGREES)
+        for sample_lon in _samples(lon, lon_radius, BLOCK_CELL_LON_DEGREES)
+    }
@@ -1,10 +1,29 @@
-"""Validation rules for restaurant data quality."""
+"""Validation rules for restaurant data quality.
 
-import re
+Provenance for non-null fields is enforced by the persistence layer, not here.
+"""
+
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 from .log import logger
+from .normalize import STANDARD_CUISINES, WEEKDAYS
+
+# Website URL schemes accepted by validation
+WEBSITE_SCHEMES = frozenset({'http', 'https'})
+
+# Records per worker process below which bulk validation stays in-process
+PARALLEL_VALIDATION_MIN_RECORDS = 20_000
+
+# Distinct weekly schedules whose validation results are memoized
+VALIDATION_CACHE_SIZE = 1024
+
+# Standard cuisine vocabulary as listed in validation messages
+VALID_CUISINES_DISPLAY = sorted(STANDARD_CUISINES)
 
 
 def validate_pincode(pincode: str) -> Tuple[bool, List[str]]:
@@ -15,12 +34,12 @@ def validate_pincode(pincode: str) -> Tuple[bool, List[str]]:
         return True, []  # Pincode is optional
     
     # Must be exactly 6 digits
-    if not re.match(r'^\d{6}$', pincode):
+    if len(pincode) != 6 or not pincode.isdecimal():
         issues.append("Pincode must be exactly 6 digits")
         return False, issues
     
     # First digit should be 1-8 for Indian pincodes
-    if pincode[0] not in '12345678':
+    if not '1' <= pincode[0] <= '8':
         issues.append("Invalid pincode: first digit must be 1-8 for India")
         return False, issues
     
@@ -35,9 +54,7 @@ def validate_phone(phone: str) -> Tuple[bool, List[str]]:
         return True, []  # Phone is optional
     
     # Expected format: +91XXXXXXXXXX
-    pattern = r'^\+91[6-9]\d{9}$'
-    
-    if not re.match(pattern, phone):
+    if not (len(phone) == 13 and phone.startswith('+91') and '6' <= phone[3] <= '9' and phone[4:].isdecimal()):
         issues.append("Phone must be in +91XXXXXXXXXX format with mobile number starting with 6-9")
         return False, issues
     
@@ -69,15 +86,54 @@ def validate_geo_coordinates(lat: Optional[float], lon: Optional[float]) -> Tupl
 
 def validate_hours(hours: Dict[str, any]) -> Tuple[bool, List[str]]:
     """Validate opening hours format and logic."""
-    issues = []
-    
     if not hours:
         return True, []  # Hours are optional
     
-    # Expected days
-    expected_days = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+    # Chains share weekly schedules, so results are memoized on the (open, close) pairs
+    schedule = _schedule_key(hours)
+    if schedule is None:
+        return _check_hours(hours)
+    
+    valid, issues = _check_schedule(schedule)
+    return valid, list(issues)
+
+
+def _schedule_key(hours: Dict[str, any]) -> Optional[Tuple[Tuple[Tuple[Optional[str], Optional[str]], ...], ...]]:
+    """Per-weekday (open, close) string pairs, or None when hours are not list-of-dict shaped."""
+    schedule = []
+    for day in WEEKDAYS:
+        day_hours = hours.get(day, [])
+        if not isinstance(day_hours, list):
+            return None
+        
+        pairs = []
+        for hours_segment in day_hours:
+            if not isinstance(hours_segment, dict):
+                return None
+            pair = (hours_segment.get('open'), hours_segment.get('close'))
+            if not all(value is None or type(value) is str for value in pair):
+                return None
+            pairs.append(pair)
+        schedule.append(tuple(pairs))
+    
+    return tuple(schedule)
+
+
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def _check_schedule(schedule: Tuple[Tuple[Tuple[Optional[str], Optional[str]], ...], ...]) -> Tuple[bool, Tuple[str, ...]]:
+    """Validate a weekly schedule built by _schedule_key."""
+    valid, issues = _check_hours({
+        day: [{'open': open_time, 'close': close_time} for open_time, close_time in pairs]
+        for day, pairs in zip(WEEKDAYS, schedule)
+    })
+    return valid, tuple(issues)
+
+
+def _check_hours(hours: Dict[str, any]) -> Tuple[bool, List[str]]:
+    """Validate each weekday's hours segments."""
+    issues = []
     
-    for day in expected_days:
+    for day in WEEKDAYS:
         day_hours = hours.get(day, [])
         
         if not isinstance(day_hours, list):
@@ -93,50 +149,47 @@ def validate_hours(hours: Dict[str, any]) -> Tuple[bool, List[str]]:
             close_time = hours_segment.get('close')
             
             # Validate time format
-            if not _is_valid_time_format(open_time):
+            open_minutes = _time_minutes(open_time)
+            if open_minutes is None:
                 issues.append(f"Invalid open time format for {day}: {open_time}")
                 continue
-                
-            if not _is_valid_time_format(close_time):
+            
+            close_minutes = _time_minutes(close_time)
+            if close_minutes is None:
                 issues.append(f"Invalid close time format for {day}: {close_time}")
                 continue
             
             # Validate time logic (open <= close, accounting for next day)
-            if not _is_valid_time_range(open_time, close_time):
+            if not _is_valid_time_range(open_minutes, close_minutes):
                 issues.append(f"Invalid time range for {day}: {open_time} to {close_time}")
     
     return len(issues) == 0, issues
 
 
-def _is_valid_time_format(time_str: str) -> bool:
-    """Check if time string is valid HH:MM format."""
+def _time_minutes(time_str: str) -> Optional[int]:
+    """Minutes after midnight for a valid HH:MM time string, None otherwise."""
     if not time_str or not isinstance(time_str, str):
-        return False
+        return None
+    
+    # H:MM or HH:MM in ASCII digits
+    hour, separator, minute = time_str.partition(':')
+    if not (separator and 1 <= len(hour) <= 2 and len(minute) == 2
+            and time_str.isascii() and (hour + minute).isdigit()):
+        return None
     
-    pattern = re.compile(r'^([01]?[0-9]|2[0-3]):[0-5][0-9]$')
-    return bool(pattern.match(time_str))
+    hours, minutes = int(hour), int(minute)
+    return hours * 60 + minutes if hours < 24 and minutes < 60 else None
 
 
-def _is_valid_time_range(open_time: str, close_time: str) -> bool:
+def _is_valid_time_range(open_minutes: int, close_minutes: int) -> bool:
     """Check if time range is valid."""
-    try:
-        # Parse times
-        open_hour, open_min = map(int, open_time.split(':'))
-        close_hour, close_min = map(int, close_time.split(':'))
-        
-        open_minutes = open_hour * 60 + open_min
-        close_minutes = close_hour * 60 + close_min
-        
-        # Allow for next-day closing (e.g., open 22:00, close 02:00)
-        if close_minutes < open_minutes:
-            close_minutes += 24 * 60  # Add 24 hours
-        
-        # Reasonable operating hours (max 24 hours)
-        duration = close_minutes - open_minutes
-        return 0 < duration <= 24 * 60
-        
-    except (ValueError, AttributeError):
-        return False
+    # Allow for next-day closing (e.g., open 22:00, close 02:00)
+    if close_minutes < open_minutes:
+        close_minutes += 24 * 60  # Add 24 hours
+    
+    # Reasonable operating hours (max 24 hours)
+    duration = close_minutes - open_minutes
+    return 0 < duration <= 24 * 60
 
 
 def validate_website_url(url: str) -> Tuple[bool, List[str]]:
@@ -146,16 +199,20 @@ def validate_website_url(url: str) -> Tuple[bool, List[str]]:
     if not url:
         return True, []  # Website is optional
     
-    # Basic URL pattern
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
-    
-    if not url_pattern.match(url):
+    # http(s) URL without whitespace, whose host is a dotted domain/IP or localhost
+    try:
+        parts = urlsplit(url)
+        valid = (
+            parts.scheme in WEBSITE_SCHEMES
+            and bool(parts.hostname)
+            and ('.' in parts.hostname or parts.hostname == 'localhost')
+            and url.split() == [url]
+        )
+        parts.port  # Raises ValueError for a malformed port
+    except ValueError:
+        valid = False
+    
+    if not valid:
         issues.append(f"Invalid URL format: {url}")
         return False, issues
     
@@ -173,26 +230,13 @@ def validate_cuisines(cuisines: List[str]) -> Tuple[bool, List[str]]:
         issues.append("Cuisines must be a list")
         return False, issues
     
-    # Standard vocabulary
-    valid_cuisines = [
-        "NORTH_INDIAN",
-        "SOUTH_INDIAN", 
-        "CHINESE",
-        "STREET_FOOD",
-        "BAKERY",
-        "CAFE",
-        "ITALIAN",
-        "MUGHLAI",
-        "SEAFOOD"
-    ]
-    
     for cuisine in cuisines:
         if not isinstance(cuisine, str):
             issues.append(f"Cuisine must be a string: {cuisine}")
             continue
             
-        if cuisine not in valid_cuisines:
-            issues.append(f"Invalid cuisine type: {cuisine}. Must be one of: {valid_cuisines}")
+        if cuisine not in STANDARD_CUISINES:
+            issues.append(f"Invalid cuisine type: {cuisine}. Must be one of: {VALID_CUISINES_DISPLAY}")
     
     return len(issues) == 0, issues
 
@@ -218,36 +262,6 @@ def validate_restaurant_name(name: str) -> Tuple[bool, List[str]]:
     return True, []
 
 
-def validate_provenance_required(restaurant_data: Dict[str, any]) -> Tuple[bool, List[str]]:
-    """Validate that non-null fields have provenance records."""
-    issues = []
-    
-    # Fields that require provenance if not null
-    provenance_required_fields = [
-        'address_full', 'pincode', 'lat', 'lon', 'phone', 'website', 'cuisines', 'hours'
-    ]
-    
-    for field in provenance_required_fields:
-        value = restaurant_data.get(field)
-        
-        # Check if field has a value
-        has_value = False
-        if value is not None:
-            if isinstance(value, str) and value.strip():
-                has_value = True
-            elif isinstance(value, (int, float)):
-                has_value = True
-            elif isinstance(value, (list, dict)) and value:
-                has_value = True
-        
-        if has_value:
-            # This field should have provenance - this would be checked in the persistence layer
-            # For now, we just note that provenance is required
-            logger.debug(f"Field {field} requires provenance", value=value)
-    
-    return True, []  # Provenance validation is handled in persistence layer
-
-
 def validate_confidence_scores(extraction_results: Dict[str, any]) -> Tuple[bool, List[str]]:
     """Validate confidence scores are within valid range."""
     issues = []
@@ -270,52 +284,70 @@ def validate_restaurant_data(data: Dict[str, any]) -> Tuple[bool, List[str]]:
     """Validate complete restaurant data record."""
     logger.debug("Validating restaurant data")
     
+    overall_valid, all_issues = _validate_restaurant_fields(data)
+    
+    if overall_valid:
+        logger.debug("Restaurant data validation passed")
+    else:
+        logger.warning("Restaurant data validation failed", issues=all_issues)
+    
+    return overall_valid, all_issues
+
+
+def validate_restaurants_bulk(
+    records: List[Dict[str, any]],
+    max_workers: Optional[int] = None
+) -> List[Tuple[bool, List[str]]]:
+    """Validate many restaurant records, logging one summary instead of one line per record."""
+    workers = min(max_workers or os.cpu_count() or 1, len(records) // PARALLEL_VALIDATION_MIN_RECORDS)
+    if workers <= 1:
+        results = _validate_records(records)
+    else:
+        # Large batches are split into one contiguous chunk per worker process
+        chunk_size = -(-len(records) // workers)
+        chunks = [records[start:start + chunk_size] for start in range(0, len(records), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = [result for chunk in executor.map(_validate_records, chunks) for result in chunk]
+    
+    invalid_count = sum(1 for valid, _ in results if not valid)
+    logger.info("Validated restaurant data", total=len(results), invalid=invalid_count)
+    
+    return results
+
+
+def _validate_records(records: List[Dict[str, any]]) -> List[Tuple[bool, List[str]]]:
+    """Run the field validators over a list of records."""
+    return [_validate_restaurant_fields(record) for record in records]
+
+
+def _validate_restaurant_fields(data: Dict[str, any]) -> Tuple[bool, List[str]]:
+    """Run the field validators over one record without logging."""
+    # Every validator that fails reports at least one issue, so the issues decide validity
     all_issues = []
-    overall_valid = True
     
     # Validate required name
-    name_valid, name_issues = validate_restaurant_name(data.get('canonical_name', ''))
-    if not name_valid:
-        overall_valid = False
-        all_issues.extend(name_issues)
+    all_issues.extend(validate_restaurant_name(data.get('canonical_name', ''))[1])
     
     # Validate optional fields
-    validators = [
-        ('pincode', validate_pincode),
-        ('phone', validate_phone),
-        ('website', validate_website_url),
-        ('cuisines', validate_cuisines),
-        ('hours', validate_hours),
-    ]
-    
-    for field, validator in validators:
+    for field, validator in FIELD_VALIDATORS:
         value = data.get(field)
         if value is not None:
-            valid, issues = validator(value)
-            if not valid:
-                overall_valid = False
-                all_issues.extend(issues)
+            all_issues.extend(validator(value)[1])
     
     # Validate coordinates together
-    lat = data.get('lat')
-    lon = data.get('lon')
-    coord_valid, coord_issues = validate_geo_coordinates(lat, lon)
-    if not coord_valid:
-        overall_valid = False
-        all_issues.extend(coord_issues)
-    
-    # Validate provenance requirements
-    prov_valid, prov_issues = validate_provenance_required(data)
-    if not prov_valid:
-        overall_valid = False
-        all_issues.extend(prov_issues)
+    all_issues.extend(validate_geo_coordinates(data.get('lat'), data.get('lon'))[1])
     
-    if overall_valid:
-        logger.debug("Restaurant data validation passed")
-    else:
-        logger.warning("Restaurant data validation failed", issues=all_issues)
-    
-    return overall_valid, all_issues
+    return not all_issues, all_issues
+
+
+# Optional-field validators, run in this order
+FIELD_VALIDATORS = (
+    ('pincode', validate_pincode),
+    ('phone', validate_phone),
+    ('website', validate_website_url),
+    ('cuisines', validate_cuisines),
+    ('hours', validate_hours),
+)
 
 
 def validate_extraction_results(results: Dict[str, any]) -> Tuple[bool, List[str]]:
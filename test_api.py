@@ -2,7 +2,6 @@
 
 import json
 import pytest
-import tempfile
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
@@ -10,28 +9,39 @@ from fastapi.testclient import TestClient
 
 from app.api import app
 from app import persist
-from app.config import settings
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def test_db():
-    """Create a temporary test database."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_db_path = Path(temp_dir) / "test_restaurants.db"
-        
-        # Patch the settings to use test database
-        with patch.object(settings, 'db_path', test_db_path):
-            persist.db_manager.init_db()
-            yield test_db_path
+    """Point the database manager at an in-memory test database for the module."""
+    original_path = persist.db_manager.db_path
+    persist.db_manager.close()
+    persist.db_manager.db_path = Path(persist.IN_MEMORY_DB_PATH)
+    persist.db_manager.init_db()
+    
+    yield persist.db_manager.db_path
+    
+    persist.db_manager.close()
+    persist.db_manager.db_path = original_path
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client(test_db):
-    """Create a test client with test database."""
+    """Create a test client with test database, shared by the module."""
     with TestClient(app) as test_client:
         yield test_client
 
 
+@pytest.fixture(autouse=True)
+def empty_tables(test_db):
+    """Delete all rows after each test so every test starts from an empty database."""
+    yield
+    
+    with persist.db_manager.engine.begin() as conn:
+        for table in reversed(persist.Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
 @pytest.fixture
 def sample_restaurants(test_db):
     """Create sample restaurant data in test database."""
@@ -3,19 +3,29 @@
 import pytest
 import tempfile
 from pathlib import Path
-from unittest.mock import Mock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
 
-from app import config, persist
+from app import config, parse, persist
+from app.extract.address import AddressExtractor
+from app.extract.base import ExtractionCache
+from app.extract.phone import PhoneExtractor
 
+# Canned structured-extraction result returned by the mock LLM client
+LLM_EXTRACTION_RESULT = {
+    "address_full": "123 Test Street, Test City",
+    "pincode": "560001"
+}
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def temp_dir():
     """Create a temporary directory for tests."""
     with tempfile.TemporaryDirectory() as tmpdir:
         yield Path(tmpdir)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def test_config(temp_dir):
     """Create test configuration."""
     original_settings = config.settings
@@ -24,7 +34,7 @@ def test_config(temp_dir):
     test_settings = config.Settings(
         data_dir=temp_dir / "data",
         export_dir=temp_dir / "exports", 
-        db_path=temp_dir / "test.sqlite",
+        db_path=Path(persist.IN_MEMORY_DB_PATH),
         llm_enabled=False,
         log_level="DEBUG"
     )
@@ -41,12 +51,52 @@ def test_config(temp_dir):
     config.settings = original_settings
 
 
-@pytest.fixture
-def test_db(test_config):
-    """Create test database."""
+@pytest.fixture(scope="session")
+def session_db(test_config):
+    """Create the test database once per session."""
+    original_path = persist.db_manager.db_path
+    persist.db_manager.close()
+    persist.db_manager.db_path = test_config.db_path
     persist.db_manager.init_db()
+    
     yield persist.db_manager
+    
     persist.db_manager.close()
+    persist.db_manager.db_path = original_path
+
+
+@pytest.fixture
+def test_db(session_db):
+    """Test database, emptied after each test."""
+    yield session_db
+    
+    with session_db.engine.begin() as conn:
+        for table in reversed(persist.Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture(scope="module")
+def content_parser():
+    """Content parser shared by a test module."""
+    return parse.ContentParser()
+
+
+@pytest.fixture(scope="session")
+def extraction_cache():
+    """Extraction result cache shared by every extractor in the session."""
+    return ExtractionCache()
+
+
+@pytest.fixture(scope="module")
+def address_extractor(extraction_cache):
+    """Address extractor shared by a test module."""
+    return AddressExtractor(cache=extraction_cache)
+
+
+@pytest.fixture(scope="module")
+def phone_extractor(extraction_cache):
+    """Phone extractor shared by a test module."""
+    return PhoneExtractor(cache=extraction_cache)
 
 
 @pytest.fixture
@@ -100,17 +150,20 @@ def sample_html_content():
     """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_llm_client():
-    """Mock LLM client for testing."""
-    with patch('app.extract.client.LLMClient') as mock_class:
-        mock_instance = Mock()
-        mock_instance.extract_structured.return_value = {
-            "address_full": "123 Test Street, Test City",
-            "pincode": "560001"
-        }
-        mock_class.return_value = mock_instance
-        yield mock_instance
+    """Mock LLM client shared by the whole session."""
+    mock_instance = Mock()
+    mock_instance.extract_structured.return_value = dict(LLM_EXTRACTION_RESULT)
+    return mock_instance
+
+
+@pytest.fixture(autouse=True)
+def _reset_llm(mock_llm_client):
+    """Clear calls and per-test return values from the shared LLM mock."""
+    yield
+    mock_llm_client.reset_mock()
+    mock_llm_client.extract_structured.return_value = dict(LLM_EXTRACTION_RESULT)
 
 
 @pytest.fixture
@@ -122,3 +175,24 @@ def mock_http_response():
     mock_response.text = "<html><body>Test content</body></html>"
     mock_response.url = "https://test.com"
     return mock_response
+
+
+@pytest.fixture
+def pipeline_mocks(monkeypatch, sample_restaurant):
+    """Stub the seed, fetch and geocode steps of the pipeline."""
+    mocks = SimpleNamespace(
+        seed=AsyncMock(return_value=[sample_restaurant.copy()]),
+        fetch=AsyncMock(return_value={
+            sample_restaurant["website"]: (
+                "<html><body>Test Restaurant<br>123 Test Street<br>+91 80 1234 5678</body></html>",
+                {"content_type": "text/html"}
+            )
+        }),
+        geocode=AsyncMock(return_value=(12.9716, 77.5946)),
+    )
+    
+    monkeypatch.setattr("app.seed.seed_city", mocks.seed)
+    monkeypatch.setattr("app.fetch.fetch_urls", mocks.fetch)
+    monkeypatch.setattr("app.geocode.geocode_address", mocks.geocode)
+    
+    return mocks